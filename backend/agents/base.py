@@ -2,12 +2,24 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import random
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, AsyncIterator
 
-from openai import AsyncAzureOpenAI
+from openai import APIConnectionError, AsyncAzureOpenAI, InternalServerError, RateLimitError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import json_repair
+except ImportError:
+    json_repair = None  # type: ignore[assignment]
 
 from backend.config import (
     AZURE_OPENAI_API_KEY,
@@ -15,10 +27,50 @@ from backend.config import (
     AZURE_OPENAI_DEPLOYMENT,
     AZURE_OPENAI_API_VERSION,
     DEFAULT_LLM_PROVIDER,
+    LLM_BACKOFF_CAP_SECONDS,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
 )
 
 logger = logging.getLogger(__name__)
 
+# What the SDK's own retries covered: rate limits, 5xx and dropped/timed-out
+# connections (APITimeoutError subclasses APIConnectionError)
+_RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APIConnectionError)
+
+# orjson parses multi-KB LLM responses several times faster than the stdlib;
+# its JSONDecodeError subclasses json.JSONDecodeError, so handlers are shared.
+_json_loads = orjson.loads if orjson else json.loads
+
+
+def json_dumps_indented(obj: Any) -> str:
+    """Serialize a prompt section like ``json.dumps(obj, indent=2)``, via orjson when installed.
+
+    Non-ASCII text is kept as UTF-8 either way; escaping it only costs prompt tokens.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def strict_object(properties: dict[str, Any]) -> dict[str, Any]:
+    """A JSON-schema object in strict structured-output form.
+
+    Strict mode requires every property to be listed as required and
+    forbids additional properties.
+    """
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def json_schema_format(name: str, schema: dict[str, Any]) -> dict[str, Any]:
+    """A call_llm response_format that constrains decoding to schema."""
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+
 
 class BaseAgent(ABC):
     """Abstract base class for all pipeline agents.
@@ -30,22 +82,33 @@ class BaseAgent(ABC):
     name: str = "BaseAgent"
     description: str = ""
 
+    # Shared by every agent instance so concurrent pipelines cannot
+    # oversubscribe the provider's rate limit.
+    _llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    _shared_client: AsyncAzureOpenAI | None = None
+
     def __init__(self, provider: str | None = None):
         self.provider = provider or DEFAULT_LLM_PROVIDER
-        self._client: AsyncAzureOpenAI | None = None
         # Store the last prompts used for UI visibility
         self.last_system_prompt: str = ""
         self.last_user_prompt: str = ""
+        self.last_finish_reason: str = ""
 
     @property
     def client(self) -> AsyncAzureOpenAI:
-        if self._client is None:
-            self._client = AsyncAzureOpenAI(
+        # One client per process, so every agent of every pipeline run draws
+        # from the same keep-alive connection pool instead of opening new
+        # TLS connections for each orchestrator. SDK retries are disabled:
+        # _create_with_retry is the only retry layer, so every attempt goes
+        # through the same backoff and semaphore slot.
+        if BaseAgent._shared_client is None:
+            BaseAgent._shared_client = AsyncAzureOpenAI(
                 api_key=AZURE_OPENAI_API_KEY,
                 azure_endpoint=AZURE_OPENAI_ENDPOINT,
                 api_version=AZURE_OPENAI_API_VERSION,
+                max_retries=0,
             )
-        return self._client
+        return BaseAgent._shared_client
 
     async def call_llm(
         self,
@@ -53,35 +116,117 @@ class BaseAgent(ABC):
         user_prompt: str,
         max_tokens: int = 16384,
         json_output: bool = True,
+        response_format: dict[str, Any] | None = None,
     ) -> str:
         """Call Azure OpenAI and return the response text.
 
         Note: GPT-5.1 is a reasoning model. max_completion_tokens includes
         both reasoning (thinking) tokens AND output tokens. We default to
         16384 to leave plenty of room for both reasoning and a full response.
+
+        Keep static text at the front of both prompts: Azure OpenAI caches
+        repeated prompt prefixes automatically, so per-call data should be
+        appended after the invariant instructions.
+
+        Calls are admitted through a process-wide semaphore and retried with
+        jittered exponential backoff on 429s, 5xx and connection errors.
+
+        response_format overrides the plain JSON mode, e.g. with a
+        ``json_schema`` format so decoding is constrained to that schema.
         """
         self.last_system_prompt = system_prompt
         self.last_user_prompt = user_prompt
         logger.info(f"[{self.name}] Calling Azure OpenAI ({AZURE_OPENAI_DEPLOYMENT}) max_tokens={max_tokens}")
 
-        kwargs: dict[str, Any] = {}
-        if json_output:
-            kwargs["response_format"] = {"type": "json_object"}
+        kwargs = self._request_kwargs(system_prompt, user_prompt, max_tokens, json_output, response_format)
+        async with self._llm_semaphore:
+            response = await self._create_with_retry(kwargs)
+
+        choice = response.choices[0]
+        text = choice.message.content or ""
+        self._log_completion(response.usage, choice.finish_reason, len(text), max_tokens)
+        return text
 
-        response = await self.client.chat.completions.create(
-            model=AZURE_OPENAI_DEPLOYMENT,
-            max_completion_tokens=max_tokens,
-            messages=[
+    async def call_llm_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int = 16384,
+        json_output: bool = True,
+        response_format: dict[str, Any] | None = None,
+    ) -> AsyncIterator[str]:
+        """Like call_llm, but yield the response text in chunks as it is generated.
+
+        The concurrency slot is held until the stream is exhausted or closed,
+        and last_finish_reason is only set once the stream ends.
+        """
+        self.last_system_prompt = system_prompt
+        self.last_user_prompt = user_prompt
+        logger.info(f"[{self.name}] Streaming Azure OpenAI ({AZURE_OPENAI_DEPLOYMENT}) max_tokens={max_tokens}")
+
+        kwargs = self._request_kwargs(system_prompt, user_prompt, max_tokens, json_output, response_format)
+        kwargs["stream"] = True
+        kwargs["stream_options"] = {"include_usage": True}
+
+        finish_reason = None
+        usage = None
+        chars = 0
+        async with self._llm_semaphore:
+            stream = await self._create_with_retry(kwargs)
+            async for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage
+                # Azure sends a leading chunk with no choices (content filter results)
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                if choice.delta and choice.delta.content:
+                    chars += len(choice.delta.content)
+                    yield choice.delta.content
+
+        self._log_completion(usage, finish_reason, chars, max_tokens)
+
+    def _request_kwargs(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        json_output: bool,
+        response_format: dict[str, Any] | None,
+    ) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {
+            "model": AZURE_OPENAI_DEPLOYMENT,
+            "max_completion_tokens": max_tokens,
+            "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
-            **kwargs,
-        )
+        }
+        if response_format is not None:
+            kwargs["response_format"] = response_format
+        elif json_output:
+            kwargs["response_format"] = {"type": "json_object"}
+        return kwargs
 
-        # Log token usage and finish reason for debugging
-        choice = response.choices[0]
-        finish_reason = choice.finish_reason
-        usage = response.usage
+    async def _create_with_retry(self, kwargs: dict[str, Any]) -> Any:
+        """Create a chat completion, backing off and retrying on 429s, 5xx and connection errors."""
+        for attempt in range(LLM_MAX_RETRIES - 1):
+            try:
+                return await self.client.chat.completions.create(**kwargs)
+            except _RETRYABLE_ERRORS as e:
+                delay = min(2 ** attempt + random.random(), LLM_BACKOFF_CAP_SECONDS)
+                logger.warning(
+                    f"[{self.name}] {type(e).__name__} (attempt {attempt + 1}/{LLM_MAX_RETRIES}), "
+                    f"retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+        return await self.client.chat.completions.create(**kwargs)
+
+    def _log_completion(self, usage: Any, finish_reason: str | None, chars: int, max_tokens: int) -> None:
+        """Record the finish reason and log token usage for debugging."""
+        self.last_finish_reason = finish_reason or ""
         if usage:
             reasoning_tokens = 0
             if usage.completion_tokens_details:
@@ -93,8 +238,7 @@ class BaseAgent(ABC):
                 f"finish: {finish_reason}"
             )
 
-        text = choice.message.content or ""
-        logger.info(f"[{self.name}] Azure OpenAI response: {len(text)} chars")
+        logger.info(f"[{self.name}] Azure OpenAI response: {chars} chars")
 
         if finish_reason == "length":
             logger.warning(
@@ -102,12 +246,15 @@ class BaseAgent(ABC):
                 f"Consider increasing max_tokens (currently {max_tokens})."
             )
 
-        return text
-
-    def parse_json(self, text: str) -> dict[str, Any]:
+    def parse_json(self, text: str, repair: bool = False) -> dict[str, Any]:
         """Extract and parse JSON from LLM response text.
 
-        Handles cases where the LLM wraps JSON in markdown code blocks.
+        Handles cases where the LLM wraps JSON in markdown code blocks or
+        surrounds it with prose. With repair=True, json_repair (when
+        installed) is tried as a last resort to fix up a malformed object.
+        It is opt-in because on a truncated response it returns a partial
+        object, which is worse than an error wherever the fields drive
+        later steps.
         """
         cleaned = text.strip()
         # Strip markdown code fences if present
@@ -117,13 +264,22 @@ class BaseAgent(ABC):
             if cleaned.endswith("```"):
                 cleaned = cleaned[:-3].strip()
         try:
-            return json.loads(cleaned)
+            return _json_loads(cleaned)
         except json.JSONDecodeError:
             logger.error(f"[{self.name}] Failed to parse JSON from LLM response")
             start = cleaned.find("{")
             end = cleaned.rfind("}") + 1
             if start != -1 and end > start:
-                return json.loads(cleaned[start:end])
+                try:
+                    return _json_loads(cleaned[start:end])
+                except json.JSONDecodeError:
+                    if not repair or json_repair is None:
+                        raise
+            if repair and json_repair is not None and start != -1:
+                repaired = json_repair.loads(cleaned[start:])
+                if isinstance(repaired, dict) and repaired:
+                    logger.warning(f"[{self.name}] Recovered malformed JSON with json_repair")
+                    return repaired
             raise
 
     @abstractmethod
@@ -2,11 +2,10 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
-from .base import BaseAgent
+from .base import BaseAgent, json_dumps_indented
 
 logger = logging.getLogger(__name__)
 
@@ -149,7 +148,7 @@ class EvalPanelAgent(BaseAgent):
 Evaluate these OBD scripts for {product_name} in {country} ({telco}).
 
 SCRIPTS:
-{json.dumps(scripts, indent=2)}
+{json_dumps_indented(scripts)}
 
 Score each variant (1-10) from each evaluator's perspective. \
 Provide consensus with ranking, top 3 improvements, and revision instructions. \
@@ -2,11 +2,10 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
-from .base import BaseAgent
+from .base import BaseAgent, json_dumps_indented
 
 logger = logging.getLogger(__name__)
 
@@ -94,7 +93,7 @@ class MarketResearcherAgent(BaseAgent):
         """
         logger.info(f"[{self.name}] Researching market: {country} / {telco}")
 
-        brief_text = json.dumps(product_brief, indent=2)
+        brief_text = json_dumps_indented(product_brief)
 
         user_prompt = f"""\
 Please perform a comprehensive market analysis for the following:
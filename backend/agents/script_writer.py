@@ -9,14 +9,28 @@ import asyncio
 import json
 import logging
 import re
-from typing import Any
+from contextlib import aclosing
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable
 
-from backend.config import MAX_SCRIPT_WORDS, NUM_SCRIPT_VARIANTS
+from backend.config import MAX_SCRIPT_WORDS, NUM_SCRIPT_VARIANTS, SCRIPT_WRITER_SINGLE_CALL
 
-from .base import BaseAgent
+from .base import BaseAgent, json_schema_format, strict_object
 
 logger = logging.getLogger(__name__)
 
+# Receives each script variant as soon as it has been generated and validated
+ScriptCallback = Callable[[dict[str, Any]], Awaitable[None]]
+
+# Matches [audio tags] within a line; the negated class never backtracks.
+_AUDIO_TAG = re.compile(r"\[[^\]\n]*\]")
+
+# max_completion_tokens for a batch of variants and for the single call that
+# writes all of them. The deployment is a reasoning model, so these also
+# cover thinking tokens, and non-Latin scripts cost far more tokens per word.
+BATCH_MAX_TOKENS = 8192
+SINGLE_CALL_MAX_TOKENS = 32768
+
 CREATIVE_ANGLES = [
     "Curiosity Gap",
     "Humor + Social Proof",
@@ -25,6 +39,18 @@ CREATIVE_ANGLES = [
     "Emotional / Aspirational",
 ]
 
+
+@lru_cache(maxsize=None)
+def _batch_plan(first: int = 0) -> tuple[tuple[list[str], int], ...]:
+    """(angles, first variant_id) for batches of 2 covering the variants from index first on.
+
+    The angles and variant count are constants, so each plan is built once
+    per process; first is non-zero only after a partial single call.
+    """
+    angles = CREATIVE_ANGLES[:NUM_SCRIPT_VARIANTS]
+    return tuple((angles[i:i + 2], i + 1) for i in range(first, len(angles), 2))
+
+
 SYSTEM_PROMPT = """\
 You are an expert OBD (Outbound Dialer) copywriter who creates promotional voice scripts \
 for telecom markets. You understand local culture, psychology, and persuasion.
@@ -48,101 +74,200 @@ RULES:
 - Total script (hook+body+cta) MUST be under {max_words} words (~30 seconds)
 - Use the local language mixed with English where appropriate
 - DTMF instruction must be crystal clear
-- Each variant must have a DIFFERENT creative angle
-
-OUTPUT: Valid JSON:
-{{"scripts": [{{"variant_id": 1, "theme": "string", "language": "string", \
-"hook": "string", "body": "string", "cta": "string", "fallback_1": "string", \
-"fallback_2": "string", "polite_closure": "string", "full_script": "string", \
-"word_count": 0, "estimated_duration_seconds": 0, \
-"audio_tags_used": ["list"]}}], \
-"language_used": "string", "creative_rationale": "string"}}\
+- Each variant must have a DIFFERENT creative angle\
 """.format(max_words=MAX_SCRIPT_WORDS)
 
 
 REVISION_SYSTEM_PROMPT = """\
 You are an expert OBD copywriter revising scripts based on evaluation feedback.
 
-Apply the feedback improvements while keeping the same JSON output format.
+Apply the feedback improvements while keeping every field of each variant.
 Each variant must be under {max_words} words, include ElevenLabs V3 audio tags, \
 be culturally relevant, and have clear DTMF CTAs.
-Keep each variant's unique creative angle (theme) while incorporating feedback.
+Keep each variant's unique creative angle (theme) while incorporating feedback.\
+""".format(max_words=MAX_SCRIPT_WORDS)
+
+# Invariant user-prompt instructions. They lead every user prompt so the
+# provider's prefix cache covers them; per-call data is appended after.
+GENERATE_USER_PREAMBLE = """\
+Create OBD promotional script variants for the product and market below. \
+Each variant needs its specified creative angle. Embed ElevenLabs V3 audio tags in every field. \
+Under {max_words} words per script.\
+""".format(max_words=MAX_SCRIPT_WORDS)
 
-OUTPUT: Valid JSON with "scripts" array.\
+REVISION_USER_PREAMBLE = """\
+Revise the OBD scripts below based on the evaluation feedback. \
+Return ALL revised variants. Keep each variant's unique theme. \
+Embed ElevenLabs V3 audio tags. Under {max_words} words per script.\
 """.format(max_words=MAX_SCRIPT_WORDS)
 
 
-def _summarize_brief(product_brief: dict[str, Any]) -> str:
-    parts = []
-    parts.append(f"Product: {product_brief.get('product_name', 'Unknown')}")
-    parts.append(f"Type: {product_brief.get('product_type', 'VAS')}")
-    desc = product_brief.get("description", "")
-    if desc:
-        parts.append(f"Description: {desc}")
-    features = product_brief.get("key_features", [])
-    if features:
-        parts.append(f"Key features: {', '.join(features[:5])}")
-    pricing = product_brief.get("pricing", {})
-    if pricing:
-        points = pricing.get("price_points", [])
-        if points:
-            parts.append(f"Pricing: {'; '.join(str(p) for p in points[:3])}")
-        elif pricing.get("model"):
-            parts.append(f"Pricing model: {pricing['model']}")
-    usps = product_brief.get("unique_selling_points", [])
-    if usps:
-        parts.append(f"USPs: {', '.join(usps[:4])}")
-    sub = product_brief.get("subscription_mechanism", "")
-    if sub:
-        parts.append(f"Subscribe via: {sub}")
+# Structured-output schema for generation and revision. Decoding is
+# constrained to it, so the prompts only describe what goes in each field.
+_SCRIPT_FIELDS: dict[str, dict[str, Any]] = {
+    "variant_id": {"type": "integer"},
+    "theme": {"type": "string"},
+    "language": {"type": "string"},
+    "hook": {"type": "string"},
+    "body": {"type": "string"},
+    "cta": {"type": "string"},
+    "fallback_1": {"type": "string"},
+    "fallback_2": {"type": "string"},
+    "polite_closure": {"type": "string"},
+    "full_script": {"type": "string"},
+    "word_count": {"type": "integer"},
+    "estimated_duration_seconds": {"type": "number"},
+    "audio_tags_used": {"type": "array", "items": {"type": "string"}},
+}
+
+SCRIPTS_SCHEMA = strict_object({
+    "scripts": {"type": "array", "items": strict_object(_SCRIPT_FIELDS)},
+    "language_used": {"type": "string"},
+    "creative_rationale": {"type": "string"},
+})
+
+SCRIPTS_RESPONSE_FORMAT = json_schema_format("obd_scripts", SCRIPTS_SCHEMA)
+
+
+# Fallback copy for fields the LLM left empty
+_SCRIPT_DEFAULTS: tuple[tuple[str, str], ...] = (
+    ("fallback_1", "Don't miss out! This exclusive offer won't last long. Press 1 now to grab it before it's gone!"),
+    ("fallback_2", "Last chance! Thousands are already enjoying this. Press 1 now or you may miss this opportunity."),
+    ("polite_closure", "Thank you for your time. Have a wonderful day!"),
+)
+
+
+# Summary tables. Header lines are always emitted (with a default); each row
+# lists candidate (key path, label, separator, limit) sources and the first
+# non-empty one produces the line. Lists are truncated to limit and joined
+# with separator; separator None means the value is used as-is.
+_SummaryHeader = tuple[tuple[str, str, str], ...]
+_SummaryRows = tuple[tuple[tuple[tuple[str, ...], str, str | None, int | None], ...], ...]
+
+_BRIEF_HEADER: _SummaryHeader = (
+    ("product_name", "Product", "Unknown"),
+    ("product_type", "Type", "VAS"),
+)
+_BRIEF_ROWS: _SummaryRows = (
+    ((("description",), "Description", None, None),),
+    ((("key_features",), "Key features", ", ", 5),),
+    (
+        (("pricing", "price_points"), "Pricing", "; ", 3),
+        (("pricing", "model"), "Pricing model", None, None),
+    ),
+    ((("unique_selling_points",), "USPs", ", ", 4),),
+    ((("subscription_mechanism",), "Subscribe via", None, None),),
+)
+
+_MARKET_HEADER: _SummaryHeader = (
+    ("country", "Country", "?"),
+    ("telco", "Telco", "?"),
+)
+_MARKET_ROWS: _SummaryRows = (
+    ((("market_overview", "dominant_language_for_promotions"), "Language for promotions", None, None),),
+    ((("market_overview", "primary_languages"), "Languages spoken", ", ", 3),),
+    ((("cultural_insights", "communication_style"), "Communication style", None, None),),
+    ((("cultural_insights", "humor_style"), "Humor style", None, None),),
+    (
+        (("cultural_insights", "local_references_to_use"), "Local references", ", ", 3),
+        (("promotion_recommendations", "local_references_to_use"), "Local references", ", ", 3),
+    ),
+    ((("promotion_recommendations", "recommended_tone"), "Recommended tone", None, None),),
+    ((("promotion_recommendations", "key_emotional_triggers"), "Emotional triggers", ", ", 4),),
+    ((("promotion_recommendations", "urgency_tactics"), "Urgency tactics", ", ", 3),),
+    ((("target_audience_psyche", "primary_segment"), "Target segment", None, None),),
+    ((("target_audience_psyche", "pain_points"), "Pain points", ", ", 3),),
+)
+
+
+def _lookup(data: Any, path: tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _summarize(data: dict[str, Any], header: _SummaryHeader, rows: _SummaryRows) -> str:
+    parts = [f"{label}: {data.get(key, default)}" for key, label, default in header]
+    for candidates in rows:
+        for path, label, sep, limit in candidates:
+            value = _lookup(data, path)
+            if value:
+                if sep is not None:
+                    value = sep.join(str(v) for v in value[:limit])
+                parts.append(f"{label}: {value}")
+                break
     return "\n".join(parts)
 
 
+def _has_actionable_feedback(feedback: dict[str, Any]) -> bool:
+    """Whether an evaluation gives the writer anything to revise against."""
+    consensus = feedback.get("consensus") or {}
+    return bool(
+        consensus.get("critical_improvements")
+        or consensus.get("revision_instructions")
+        or feedback.get("evaluations")
+    )
+
+
+async def _iter_array_objects(chunks: AsyncIterator[str], key: str) -> AsyncIterator[str]:
+    """Yield the JSON text of each object in the ``key`` array as soon as it closes.
+
+    Relies on the structured-output schema emitting ``key`` as the first
+    property, so its first occurrence is the array itself. The rest of the
+    stream is drained after the array closes so the caller sees it finish.
+    """
+    marker = f'"{key}"'
+    buf = ""
+    pos = 0
+    start = 0
+    depth = 0
+    in_array = closed = in_string = escaped = False
+    async for chunk in chunks:
+        if closed:
+            continue
+        buf += chunk
+        if not in_array:
+            at = buf.find(marker)
+            bracket = buf.find("[", at + len(marker)) if at != -1 else -1
+            if bracket == -1:
+                continue
+            in_array = True
+            buf = buf[bracket + 1:]
+        while pos < len(buf):
+            ch = buf[pos]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == "{" or ch == "[":
+                if depth == 0:
+                    start = pos
+                depth += 1
+            elif ch == "}" or ch == "]":
+                if depth == 0:
+                    closed = True
+                    break
+                depth -= 1
+                if depth == 0:
+                    yield buf[start:pos + 1]
+                    buf = buf[pos + 1:]
+                    pos = -1
+            pos += 1
+
+
+def _summarize_brief(product_brief: dict[str, Any]) -> str:
+    return _summarize(product_brief, _BRIEF_HEADER, _BRIEF_ROWS)
+
+
 def _summarize_market(market_analysis: dict[str, Any]) -> str:
-    parts = []
-    parts.append(f"Country: {market_analysis.get('country', '?')}")
-    parts.append(f"Telco: {market_analysis.get('telco', '?')}")
-    overview = market_analysis.get("market_overview", {})
-    if overview:
-        lang = overview.get("dominant_language_for_promotions", "")
-        if lang:
-            parts.append(f"Language for promotions: {lang}")
-        langs = overview.get("primary_languages", [])
-        if langs:
-            parts.append(f"Languages spoken: {', '.join(langs[:3])}")
-    culture = market_analysis.get("cultural_insights", {})
-    if culture:
-        style = culture.get("communication_style", "")
-        if style:
-            parts.append(f"Communication style: {style}")
-        humor = culture.get("humor_style", "")
-        if humor:
-            parts.append(f"Humor style: {humor}")
-        refs = culture.get("local_references_to_use", [])
-        if not refs:
-            refs = market_analysis.get("promotion_recommendations", {}).get("local_references_to_use", [])
-        if refs:
-            parts.append(f"Local references: {', '.join(refs[:3])}")
-    promo = market_analysis.get("promotion_recommendations", {})
-    if promo:
-        tone = promo.get("recommended_tone", "")
-        if tone:
-            parts.append(f"Recommended tone: {tone}")
-        triggers = promo.get("key_emotional_triggers", [])
-        if triggers:
-            parts.append(f"Emotional triggers: {', '.join(triggers[:4])}")
-        urgency = promo.get("urgency_tactics", [])
-        if urgency:
-            parts.append(f"Urgency tactics: {', '.join(urgency[:3])}")
-    audience = market_analysis.get("target_audience_psyche", {})
-    if audience:
-        segment = audience.get("primary_segment", "")
-        if segment:
-            parts.append(f"Target segment: {segment}")
-        pains = audience.get("pain_points", [])
-        if pains:
-            parts.append(f"Pain points: {', '.join(pains[:3])}")
-    return "\n".join(parts)
+    return _summarize(market_analysis, _MARKET_HEADER, _MARKET_ROWS)
 
 
 class ScriptWriterAgent(BaseAgent):
@@ -151,6 +276,11 @@ class ScriptWriterAgent(BaseAgent):
     name = "ScriptWriter"
     description = "Creates compelling OBD scripts with cultural relevance and audio tags"
 
+    def __init__(self, provider: str | None = None):
+        super().__init__(provider=provider)
+        # How the last generation was produced, for the creative_rationale
+        self._generation_source = ""
+
     async def run(
         self,
         product_brief: dict[str, Any],
@@ -158,25 +288,68 @@ class ScriptWriterAgent(BaseAgent):
         feedback: dict[str, Any] | None = None,
         previous_scripts: dict[str, Any] | None = None,
         language_override: str | None = None,
+        on_script: ScriptCallback | None = None,
         **kwargs: Any,
     ) -> dict[str, Any]:
+        """Generate (or revise) the full set of script variants.
+
+        on_script, if given, is awaited with each validated variant as soon
+        as it is ready, before the rest of the set completes.
+        """
         is_revision = feedback is not None and previous_scripts is not None
+        if is_revision and not previous_scripts.get("scripts"):
+            return previous_scripts
+        if is_revision and not _has_actionable_feedback(feedback):
+            logger.info(f"[{self.name}] No actionable feedback -- keeping previous scripts")
+            self._validate_scripts(previous_scripts["scripts"])
+            return previous_scripts
+
         if is_revision:
             logger.info(f"[{self.name}] Revising scripts based on evaluation feedback")
-            return await self._revise(product_brief, market_analysis, feedback, previous_scripts, language_override)
-        else:
-            logger.info(f"[{self.name}] Generating {NUM_SCRIPT_VARIANTS} new script variants (lang={language_override})")
-            return await self._generate(product_brief, market_analysis, language_override)
-
-    async def _generate_batch(
+            # Each batch lands in the slot of its first original script, so
+            # the result comes out in variant order without a sort.
+            slots: list[list[dict[str, Any]] | None] = [None] * len(previous_scripts["scripts"])
+            async for start, batch in self._revise_batches(feedback, previous_scripts, language_override):
+                slots[start] = batch
+                if on_script is not None:
+                    for script in batch:
+                        await on_script(script)
+            revised = [script for batch in slots if batch for script in batch]
+            return self._finalize_revised(revised, previous_scripts)
+
+        scripts: list[dict[str, Any]] = []
+        async for script in self.run_stream(product_brief, market_analysis, language_override=language_override):
+            scripts.append(script)
+            if on_script is not None:
+                await on_script(script)
+        return self._finalize_generated(scripts)
+
+    async def run_stream(
+        self,
+        product_brief: dict[str, Any],
+        market_analysis: dict[str, Any],
+        language_override: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield newly generated, validated script variants as soon as their batch completes.
+
+        Variants arrive in completion order carrying their planned
+        variant_id; run() orders and renumbers them into the usual 1-based
+        result. Revision is handled by run() through _revise_batches.
+        """
+        logger.info(f"[{self.name}] Generating {NUM_SCRIPT_VARIANTS} new script variants (lang={language_override})")
+        async for script in self._generate(product_brief, market_analysis, language_override):
+            yield script
+
+    def _generation_prompt(
         self,
         brief_summary: str,
         market_summary: str,
         angles: list[str],
         start_id: int,
         language_override: str | None = None,
-    ) -> list[dict[str, Any]]:
-        """Generate a small batch of script variants (2-3 at a time)."""
+    ) -> str:
+        """Build the user prompt asking for angles as variant ids start_id, start_id + 1, ..."""
         angle_list = ", ".join(angles)
         count = len(angles)
         ids = ", ".join(str(start_id + i) for i in range(count))
@@ -189,9 +362,10 @@ class ScriptWriterAgent(BaseAgent):
                 f"closure, and full_script. Mix with English only for brand names and technical terms."
             )
 
-        user_prompt = f"""\
-Create exactly {count} OBD promotional script variant(s) with these creative angles: {angle_list}.
-Use variant_id values: {ids}.
+        # Static preamble first, then data shared by all batches, then the
+        # per-batch angles, so sibling batches share the longest prefix.
+        return f"""\
+{GENERATE_USER_PREAMBLE}
 
 PRODUCT:
 {brief_summary}
@@ -199,18 +373,32 @@ PRODUCT:
 MARKET:
 {market_summary}{lang_instruction}
 
-Each variant needs its specified creative angle. Embed ElevenLabs V3 audio tags in every field. \
-Under {MAX_SCRIPT_WORDS} words per script. Output valid JSON with "scripts" array of {count} objects.\
+ANGLES: Create exactly {count} variant(s) with these creative angles: {angle_list}.
+Use variant_id values: {ids}. The "scripts" array must contain {count} objects.\
 """
 
+    async def _generate_batch(
+        self,
+        brief_summary: str,
+        market_summary: str,
+        angles: list[str],
+        start_id: int,
+        language_override: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Generate a batch of script variants (2-3 at a time, or all in single-call mode)."""
+        count = len(angles)
+        user_prompt = self._generation_prompt(brief_summary, market_summary, angles, start_id, language_override)
         response = await self.call_llm(
             system_prompt=SYSTEM_PROMPT,
             user_prompt=user_prompt,
-            max_tokens=8192,
+            max_tokens=BATCH_MAX_TOKENS,
+            response_format=SCRIPTS_RESPONSE_FORMAT,
         )
 
         logger.info(f"[{self.name}] Batch response ({count} scripts): {len(response)} chars")
-        result = self._normalize_result(response)
+        # Parse off the event loop so batches finishing together don't
+        # serialize their decodes ahead of other agents' wakeups.
+        result = await asyncio.to_thread(self._normalize_result, response)
         return result.get("scripts", [])
 
     async def _generate(
@@ -218,45 +406,96 @@ Under {MAX_SCRIPT_WORDS} words per script. Output valid JSON with "scripts" arra
         product_brief: dict[str, Any],
         market_analysis: dict[str, Any],
         language_override: str | None = None,
-    ) -> dict[str, Any]:
+    ) -> AsyncIterator[dict[str, Any]]:
         """Generate scripts in parallel batches to avoid LLM output-length limits."""
         brief_summary = _summarize_brief(product_brief)
         market_summary = _summarize_market(market_analysis)
 
         angles = CREATIVE_ANGLES[:NUM_SCRIPT_VARIANTS]
 
-        # Split into batches of 2
-        batches: list[tuple[list[str], int]] = []
-        for i in range(0, len(angles), 2):
-            batch_angles = angles[i:i + 2]
-            batches.append((batch_angles, i + 1))
-
+        # Variants already delivered by the single call; batches cover the rest
+        done = 0
+        if SCRIPT_WRITER_SINGLE_CALL:
+            async for script in self._stream_single_call(brief_summary, market_summary, angles, language_override):
+                done += 1
+                script["variant_id"] = done
+                self._validate_scripts([script])
+                yield script
+            if done >= len(angles):
+                self._generation_source = "a single call"
+                return
+
+        batches = _batch_plan(done)
+        self._generation_source = "1 batch" if len(batches) == 1 else f"{len(batches)} parallel batches"
         logger.info(
-            f"[{self.name}] Generating {len(angles)} variants in {len(batches)} "
-            f"parallel batches of 2 (lang={language_override})"
+            f"[{self.name}] Generating {len(angles) - done} variant(s) in {self._generation_source} "
+            f"of up to 2 (lang={language_override})"
         )
+        if done:
+            self._generation_source = f"a single call and {self._generation_source}"
+
+        async for i, res in self._iter_batches_with_retry(
+            lambda i: self._generate_batch(
+                brief_summary, market_summary, batches[i][0], batches[i][1], language_override
+            ),
+            len(batches),
+            "Batch",
+        ):
+            if res is None:
+                continue
+            start_id = batches[i][1]
+            for offset, script in enumerate(res):
+                script["variant_id"] = start_id + offset
+            self._validate_scripts(res)
+            for script in res:
+                yield script
+
+    async def _stream_single_call(
+        self,
+        brief_summary: str,
+        market_summary: str,
+        angles: list[str],
+        language_override: str | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Generate every variant in one streamed LLM call.
+
+        Each variant is yielded as soon as its JSON object closes. The stream
+        stops early on an error or a truncated response; the caller generates
+        whatever is missing in parallel batches.
+        """
+        logger.info(f"[{self.name}] Generating {len(angles)} variants in a single call (lang={language_override})")
+        user_prompt = self._generation_prompt(brief_summary, market_summary, angles, 1, language_override)
+        count = 0
+        try:
+            async with aclosing(
+                self.call_llm_stream(
+                    system_prompt=SYSTEM_PROMPT,
+                    user_prompt=user_prompt,
+                    max_tokens=SINGLE_CALL_MAX_TOKENS,
+                    response_format=SCRIPTS_RESPONSE_FORMAT,
+                )
+            ) as chunks, aclosing(_iter_array_objects(chunks, "scripts")) as objects:
+                async for text in objects:
+                    # Each object has already closed, so it is never
+                    # truncated; repair only fixes minor malformations.
+                    script = self.parse_json(text, repair=True)
+                    count += 1
+                    self._normalize_script(script, count)
+                    yield script
+        except Exception as e:
+            logger.warning(f"[{self.name}] Single-call generation failed after {count} variants: {e}")
+            return
+
+        if self.last_finish_reason == "length" or count < len(angles):
+            logger.warning(
+                f"[{self.name}] Single-call generation incomplete ({count}/{len(angles)} variants, "
+                f"finish={self.last_finish_reason})"
+            )
 
-        tasks = [
-            self._generate_batch(brief_summary, market_summary, batch_angles, start_id, language_override)
-            for batch_angles, start_id in batches
-        ]
-        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        all_scripts: list[dict[str, Any]] = []
-        for i, res in enumerate(batch_results):
-            if isinstance(res, Exception):
-                logger.warning(f"[{self.name}] Batch {i+1} failed: {res} -- retrying once")
-                try:
-                    retry = await self._generate_batch(
-                        brief_summary, market_summary, batches[i][0], batches[i][1], language_override
-                    )
-                    all_scripts.extend(retry)
-                except Exception as retry_err:
-                    logger.error(f"[{self.name}] Batch {i+1} retry also failed: {retry_err}")
-            else:
-                all_scripts.extend(res)
-
+    def _finalize_generated(self, all_scripts: list[dict[str, Any]]) -> dict[str, Any]:
+        """Order and re-number streamed scripts and wrap them in the result envelope."""
         # Re-number variant IDs sequentially (always 1-based)
+        all_scripts.sort(key=lambda s: s["variant_id"])
         for idx, script in enumerate(all_scripts):
             script["variant_id"] = idx + 1
 
@@ -268,24 +507,27 @@ Under {MAX_SCRIPT_WORDS} words per script. Output valid JSON with "scripts" arra
                 f"Some batches may have failed."
             )
 
-        result: dict[str, Any] = {
+        return {
             "scripts": all_scripts,
             "language_used": all_scripts[0].get("language", "") if all_scripts else "",
-            "creative_rationale": f"Generated {len(all_scripts)} variants across {len(batches)} parallel batches",
+            "creative_rationale": (
+                f"Generated {len(all_scripts)} variant{'' if len(all_scripts) == 1 else 's'} "
+                f"across {self._generation_source}"
+            ),
         }
 
-        self._validate_scripts(result)
-        return result
-
-    async def _revise(
+    async def _revise_batches(
         self,
-        product_brief: dict[str, Any],
-        market_analysis: dict[str, Any],
         feedback: dict[str, Any],
         previous_scripts: dict[str, Any],
         language_override: str | None = None,
-    ) -> dict[str, Any]:
-        """Revise scripts in parallel batches based on evaluation feedback."""
+    ) -> AsyncIterator[tuple[int, list[dict[str, Any]]]]:
+        """Yield (start index, revised batch) in completion order.
+
+        start is the position of the batch's first script in
+        previous_scripts["scripts"]. run() has already returned early when
+        there are no scripts or no actionable feedback.
+        """
         consensus = feedback.get("consensus", {})
         improvements = consensus.get("critical_improvements", [])
         instructions = consensus.get("revision_instructions", "")
@@ -296,7 +538,7 @@ Under {MAX_SCRIPT_WORDS} words per script. Output valid JSON with "scripts" arra
         if instructions:
             feedback_text += f"\n\nRevision instructions: {instructions}"
         if not feedback_text:
-            feedback_text = json.dumps(feedback, indent=2)[:2000]
+            feedback_text = json.dumps(feedback, separators=(",", ":"), ensure_ascii=False)[:2000]
 
         lang_instruction = ""
         if language_override:
@@ -305,32 +547,29 @@ Under {MAX_SCRIPT_WORDS} words per script. Output valid JSON with "scripts" arra
                 f"Do not switch to any other language."
             )
 
-        scripts = previous_scripts.get("scripts", [])
-        if not scripts:
-            return previous_scripts
+        scripts = previous_scripts["scripts"]
 
         # Revise in batches of 2
-        async def _revise_batch(batch_scripts: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        async def _revise_batch(batch_scripts: list[dict[str, Any]], batch_json: str) -> list[dict[str, Any]]:
             count = len(batch_scripts)
             user_prompt = f"""\
-Revise these {count} OBD script(s) based on evaluation feedback.
-
-CURRENT SCRIPTS:
-{json.dumps({"scripts": batch_scripts}, indent=2)}
+{REVISION_USER_PREAMBLE}
 
 FEEDBACK:
 {feedback_text}{lang_instruction}
 
-Return ALL {count} revised variants. Keep each variant's unique theme. \
-Embed ElevenLabs V3 audio tags. Under {MAX_SCRIPT_WORDS} words per script. \
-Output valid JSON with "scripts" array of {count} objects.\
+CURRENT SCRIPTS:
+{batch_json}
+
+Return {count} revised variant(s): the "scripts" array must contain {count} objects.\
 """
             response = await self.call_llm(
                 system_prompt=REVISION_SYSTEM_PROMPT,
                 user_prompt=user_prompt,
-                max_tokens=8192,
+                max_tokens=BATCH_MAX_TOKENS,
+                response_format=SCRIPTS_RESPONSE_FORMAT,
             )
-            result = self._normalize_result(response)
+            result = await asyncio.to_thread(self._normalize_result, response)
             revised = result.get("scripts", [])
 
             # If revision returned fewer, merge originals back
@@ -343,35 +582,81 @@ Output valid JSON with "scripts" array of {count} objects.\
             return revised
 
         batches = [scripts[i:i + 2] for i in range(0, len(scripts), 2)]
-        logger.info(f"[{self.name}] Revising {len(scripts)} scripts in {len(batches)} parallel batches")
-
-        tasks = [_revise_batch(batch) for batch in batches]
-        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(f"[{self.name}] Revising {len(scripts)} script(s) in {len(batches)} batch(es)")
+
+        # Serialize each script once, compactly (indent roughly doubles the
+        # prompt tokens); retries reuse the same payload.
+        script_json = [json.dumps(sc, separators=(",", ":"), ensure_ascii=False) for sc in scripts]
+        batch_payloads = [
+            '{"scripts":[' + ",".join(script_json[i:i + 2]) + "]}"
+            for i in range(0, len(scripts), 2)
+        ]
 
-        all_revised: list[dict[str, Any]] = []
-        for i, res in enumerate(batch_results):
-            if isinstance(res, Exception):
-                logger.warning(f"[{self.name}] Revision batch {i+1} failed: {res} -- keeping originals")
-                all_revised.extend(batches[i])
-            else:
-                all_revised.extend(res)
+        async for i, res in self._iter_batches_with_retry(
+            lambda i: _revise_batch(batches[i], batch_payloads[i]), len(batches), "Revision batch"
+        ):
+            if res is None:
+                logger.warning(f"[{self.name}] Revision batch {i+1} keeping originals")
+                res = batches[i]
+            self._validate_scripts(res)
+            yield i * 2, res
 
+    def _finalize_revised(
+        self,
+        all_revised: list[dict[str, Any]],
+        previous_scripts: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Re-number revisions (already in variant order) and wrap them in the result envelope."""
         # Re-number sequentially to guarantee 1-based IDs
-        all_revised.sort(key=lambda s: s.get("variant_id", 0))
         for idx, script in enumerate(all_revised):
             script["variant_id"] = idx + 1
 
-        result: dict[str, Any] = {
+        return {
             "scripts": all_revised,
             "language_used": previous_scripts.get("language_used", ""),
             "creative_rationale": f"Revised {len(all_revised)} variants based on evaluation feedback",
         }
 
-        self._validate_scripts(result)
-        return result
+    async def _iter_batches_with_retry(
+        self,
+        make_batch: Callable[[int], Awaitable[list[dict[str, Any]]]],
+        num_batches: int,
+        label: str,
+    ) -> AsyncIterator[tuple[int, list[dict[str, Any]] | None]]:
+        """Run batches concurrently, retrying each failure once as soon as it happens.
+
+        Yields (batch_index, scripts) in completion order, so retries overlap
+        with batches still in flight and callers can consume early batches
+        before the slowest one returns. scripts is None when the retry also
+        failed.
+        """
+        pending: dict[asyncio.Task[list[dict[str, Any]]], tuple[int, bool]] = {
+            asyncio.ensure_future(make_batch(i)): (i, False) for i in range(num_batches)
+        }
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    i, is_retry = pending.pop(task)
+                    try:
+                        scripts: list[dict[str, Any]] | None = task.result()
+                    except Exception as e:
+                        if not is_retry:
+                            logger.warning(f"[{self.name}] {label} {i+1} failed: {e} -- retrying once")
+                            pending[asyncio.ensure_future(make_batch(i))] = (i, True)
+                            continue
+                        logger.error(f"[{self.name}] {label} {i+1} retry also failed: {e}")
+                        scripts = None
+                    yield i, scripts
+        finally:
+            # A consumer that stops early must not leave LLM calls running.
+            for task in pending:
+                task.cancel()
 
     def _normalize_result(self, response: str) -> dict[str, Any]:
         """Parse and normalize the LLM response into expected format."""
+        # No repair: a repaired (truncated) batch would yield half-written
+        # scripts; failing lets the batch retry instead.
         result = self.parse_json(response)
 
         if "scripts" not in result and "variants" in result:
@@ -392,34 +677,32 @@ Output valid JSON with "scripts" array of {count} objects.\
             result["scripts"] = []
 
         for i, script in enumerate(result.get("scripts", [])):
-            if "variant_id" not in script:
-                script["variant_id"] = i + 1
-            if "full_script" not in script and "hook" in script:
-                script["full_script"] = f"{script.get('hook', '')} {script.get('body', '')} {script.get('cta', '')}"
-            if not script.get("fallback_1"):
-                script["fallback_1"] = (
-                    "Don't miss out! This exclusive offer won't last long. Press 1 now to grab it before it's gone!"
-                )
-            if not script.get("fallback_2"):
-                script["fallback_2"] = (
-                    "Last chance! Thousands are already enjoying this. Press 1 now or you may miss this opportunity."
-                )
-            if not script.get("polite_closure"):
-                script["polite_closure"] = (
-                    "Thank you for your time. Have a wonderful day!"
-                )
+            self._normalize_script(script, i + 1)
 
         return result
 
-    def _validate_scripts(self, result: dict[str, Any]) -> None:
-        """Validate script word counts and structure."""
-        scripts = result.get("scripts", [])
+    @staticmethod
+    def _normalize_script(script: dict[str, Any], variant_id: int) -> None:
+        """Fill in the id, full_script and fallback copy of one parsed variant."""
+        if "variant_id" not in script:
+            script["variant_id"] = variant_id
+        if "full_script" not in script and "hook" in script:
+            script["full_script"] = " ".join(
+                (script.get("hook", ""), script.get("body", ""), script.get("cta", ""))
+            )
+        for key, default in _SCRIPT_DEFAULTS:
+            if not script.get(key):
+                script[key] = default
+
+    def _validate_scripts(self, scripts: list[dict[str, Any]]) -> None:
+        """Validate word counts and fill in duration estimates for a batch."""
         for script in scripts:
-            full_text = script.get("full_script", "")
-            clean_text = re.sub(r"\[.*?\]", "", full_text)
+            clean_text = _AUDIO_TAG.sub("", script.get("full_script", ""))
             word_count = len(clean_text.split())
             script["word_count"] = word_count
-            script["estimated_duration_seconds"] = round(word_count / 2.5, 1)
+            # 2.5 words/s: word_count / 2.5 is a whole number of tenths
+            # (4 * word_count), so this equals round(word_count / 2.5, 1)
+            script["estimated_duration_seconds"] = word_count * 4 / 10
 
             if word_count > MAX_SCRIPT_WORDS + 10:
                 logger.warning(
@@ -2,15 +2,17 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import re
 from typing import Any
 
 import httpx
 
-from backend.config import ELEVENLABS_API_KEY, ELEVENLABS_BASE_URL
+from backend.config import CACHE_DIR, ELEVENLABS_API_KEY, ELEVENLABS_BASE_URL
 
-from .base import BaseAgent
+from .base import BaseAgent, json_dumps_indented, json_schema_format, strict_object
 
 logger = logging.getLogger(__name__)
 
@@ -48,48 +50,225 @@ ElevenLabs Model IDs (MUST use one of these):
 
 IMPORTANT: Always recommend "eleven_multilingual_v2" as the model_id. Do NOT recommend "eleven_v3".
 
-Output valid JSON:
-{
-  "selected_voice": {
-    "voice_id": "string",
-    "name": "string",
-    "description": "string",
-    "language": "string",
-    "gender": "string",
-    "age": "string",
-    "accent": "string",
-    "preview_url": "string - URL to preview this voice (if available)"
-  },
-  "voice_settings": {
-    "stability": number,
-    "similarity_boost": number,
-    "style": number,
-    "speed": number
-  },
-  "elevenlabs_api_params": {
-    "model_id": "string - recommended ElevenLabs model ID (e.g. eleven_v3)",
-    "output_format": "mp3_44100_128",
-    "voice_id": "string - same as selected_voice.voice_id",
-    "voice_settings": {
-      "stability": number,
-      "similarity_boost": number,
-      "style": number,
-      "use_speaker_boost": true
+Copy voice_id, name and preview_url exactly from the voice list. elevenlabs_api_params.voice_id \
+is the selected voice's voice_id; sample_api_call is an example curl command for ElevenLabs TTS \
+with those params.\
+"""
+
+_STRING = {"type": "string"}
+_NUMBER = {"type": "number"}
+
+# Structured-output schema for the selection. Decoding is constrained to
+# it, so SYSTEM_PROMPT only explains the fields that are not self-evident.
+VOICE_SELECTION_SCHEMA = strict_object({
+    "selected_voice": strict_object({
+        "voice_id": _STRING,
+        "name": _STRING,
+        "description": _STRING,
+        "language": _STRING,
+        "gender": _STRING,
+        "age": _STRING,
+        "accent": _STRING,
+        "preview_url": _STRING,
+    }),
+    "voice_settings": strict_object({
+        "stability": _NUMBER,
+        "similarity_boost": _NUMBER,
+        "style": _NUMBER,
+        "speed": _NUMBER,
+    }),
+    "elevenlabs_api_params": strict_object({
+        "model_id": _STRING,
+        "output_format": _STRING,
+        "voice_id": _STRING,
+        "voice_settings": strict_object({
+            "stability": _NUMBER,
+            "similarity_boost": _NUMBER,
+            "style": _NUMBER,
+            "use_speaker_boost": {"type": "boolean"},
+        }),
+        "sample_api_call": _STRING,
+    }),
+    "rationale": _STRING,
+    "alternative_voices": {
+        "type": "array",
+        "items": strict_object({
+            "voice_id": _STRING,
+            "name": _STRING,
+            "reason": _STRING,
+            "preview_url": _STRING,
+        }),
+    },
+    "audio_production_notes": _STRING,
+})
+
+VOICE_SELECTION_RESPONSE_FORMAT = json_schema_format("voice_selection", VOICE_SELECTION_SCHEMA)
+
+# Invariant user-prompt instructions. They lead the user prompt, followed by
+# the voice list (the same for every campaign in a market), so the provider's
+# prefix cache covers both; per-campaign data is appended after.
+SELECT_USER_PREAMBLE = """\
+Select the best voice for this OBD campaign from the available voices below. \
+Choose the voice that will be most effective for the specific market and scripts, \
+and configure the V3 parameters for maximum expressiveness with audio tags.\
+"""
+
+# Known good multilingual voices, used when the ElevenLabs voice list is unavailable
+_CURATED_ELEVENLABS_VOICES: list[dict[str, Any]] = [
+    {
+        "voice_id": "JBFqnCBsd6RMkjVDRZzb",
+        "name": "George",
+        "description": "Warm, clear male voice suitable for narration",
+        "labels": {"accent": "British", "gender": "male", "age": "middle-aged"},
+        "category": "premade",
     },
-    "sample_api_call": "string - example curl command to call ElevenLabs TTS with these params"
-  },
-  "rationale": "string - why this voice was selected",
-  "alternative_voices": [
     {
-      "voice_id": "string",
-      "name": "string",
-      "reason": "string - why this is a good alternative",
-      "preview_url": "string - URL to preview this voice (copy from the voice list)"
+        "voice_id": "EXAVITQu4vr4xnSDxMaL",
+        "name": "Sarah",
+        "description": "Soft, friendly female voice",
+        "labels": {"accent": "American", "gender": "female", "age": "young"},
+        "category": "premade",
+    },
+]
+_CURATED_VOICES_JSON = json_dumps_indented(_CURATED_ELEVENLABS_VOICES)
+
+# Long-lived ElevenLabs client so repeat fetches reuse one warm (HTTP/2)
+# connection instead of a fresh TCP+TLS handshake per campaign.
+_http_client: httpx.AsyncClient | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+    return _http_client
+
+
+# Accent / regional markers looked for in a voice's name, description and
+# labels, per target country (lower-cased).
+_COUNTRY_MARKERS: dict[str, tuple[str, ...]] = {
+    "bangladesh": ("bangladeshi", "bengali", "indian"),
+    "botswana": ("botswanan", "setswana", "african"),
+    "cameroon": ("cameroonian", "african", "french"),
+    "congo (drc)": ("congolese", "african", "french"),
+    "congo (republic)": ("congolese", "african", "french"),
+    "ethiopia": ("ethiopian", "amharic", "african"),
+    "ghana": ("ghanaian", "african"),
+    "guyana": ("guyanese", "caribbean"),
+    "haiti": ("haitian", "creole", "caribbean", "french"),
+    "india": ("indian", "hindi"),
+    "indonesia": ("indonesian",),
+    "kenya": ("kenyan", "swahili", "african"),
+    "mozambique": ("mozambican", "portuguese", "african"),
+    "nigeria": ("nigerian", "african"),
+    "pakistan": ("pakistani", "urdu", "indian"),
+    "philippines": ("filipino", "filipina", "tagalog"),
+    "rwanda": ("rwandan", "african"),
+    "senegal": ("senegalese", "african", "french"),
+    "somalia": ("somali", "african", "arabic"),
+    "south africa": ("south african", "african"),
+    "tanzania": ("tanzanian", "swahili", "african"),
+    "uganda": ("ugandan", "african"),
+    "zambia": ("zambian", "african"),
+    "zimbabwe": ("zimbabwean", "african"),
+}
+# Language and accent names picked out of the free-text target language.
+# Other words ("mixed", "with", "and") are ignored since generic voice
+# descriptions contain them too, and so is "english", which nearly every
+# voice matches.
+_LANGUAGE_MARKERS = frozenset({
+    "afrikaans", "amharic", "arabic", "bangla", "bemba", "bengali", "burmese",
+    "chichewa", "creole", "filipino", "french", "hausa", "hindi", "igbo",
+    "indonesian", "khmer", "kinyarwanda", "lingala", "luganda", "malay",
+    "nepali", "nyanja", "oromo", "portuguese", "sesotho", "setswana", "shona",
+    "sinhala", "somali", "spanish", "swahili", "tagalog", "tamil", "telugu",
+    "tigrinya", "twi", "urdu", "wolof", "xhosa", "yoruba", "zulu",
+})
+_WORD = re.compile(r"[a-z]+")
+_COUNTRY_MARKER_WEIGHT = 2  # a country/accent hit outranks a language-word hit
+_SHORTLIST_MATCHES = 15  # best-matching voices sent to the LLM
+_SHORTLIST_NEUTRAL = 5  # plus this many unmatched voices as neutral options
+
+
+def _shortlist_voices(
+    voices: list[dict[str, Any]], country: str, language: str
+) -> list[dict[str, Any]] | None:
+    """Narrow the catalog to voices whose metadata matches the market.
+
+    Voices are scored by the country markers (weighted double) and the
+    language names from _LANGUAGE_MARKERS found as whole words in their
+    metadata. Returns None when there is nothing specific to match or no
+    voice matches, so the caller sends the full catalog.
+    """
+    weights = {
+        word: 1 for word in _WORD.findall(str(language or "").lower()) if word in _LANGUAGE_MARKERS
     }
-  ],
-  "audio_production_notes": "string - tips for best results with this voice and these scripts"
-}\
-"""
+    for marker in _COUNTRY_MARKERS.get(str(country or "").strip().lower(), ()):
+        weights[marker] = _COUNTRY_MARKER_WEIGHT
+    if not weights:
+        return None
+    # Space-delimited so " twi " cannot match inside "between"
+    padded = {marker: f" {marker} " for marker in weights}
+
+    scored: list[tuple[int, dict[str, Any]]] = []
+    neutral: list[dict[str, Any]] = []
+    for voice in voices:
+        labels = voice.get("labels")
+        fields = [voice.get("name"), voice.get("description")]
+        if isinstance(labels, dict):
+            fields += labels.values()
+        words = _WORD.findall(" ".join(str(f) for f in fields if f).lower())
+        text = f" {' '.join(words)} "
+        score = sum(weight for marker, weight in weights.items() if padded[marker] in text)
+        if score:
+            scored.append((score, voice))
+        elif len(neutral) < _SHORTLIST_NEUTRAL:
+            neutral.append(voice)
+    if not scored:
+        return None
+
+    scored.sort(key=lambda sv: sv[0], reverse=True)
+    return [voice for _, voice in scored[:_SHORTLIST_MATCHES]] + neutral
+
+
+# One cache file per API key (hashed), since each account sees its own voices
+_VOICES_CACHE_PATH = CACHE_DIR / (
+    f"voices-{hashlib.blake2b(ELEVENLABS_API_KEY.encode(), digest_size=8).hexdigest()}.json"
+)
+
+
+def _load_voices_cache() -> dict[str, Any] | None:
+    try:
+        cached = json.loads(_VOICES_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(cached, dict)
+        or not isinstance(cached.get("voices"), list)
+        or not isinstance(cached.get("voices_json"), str)
+    ):
+        return None
+    return cached
+
+
+def _save_voices_cache(cached: dict[str, Any]) -> None:
+    try:
+        _VOICES_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _VOICES_CACHE_PATH.write_text(json.dumps(cached), encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"Could not write voice cache {_VOICES_CACHE_PATH}: {e}")
+
+
+async def aclose_http_client() -> None:
+    """Close the shared ElevenLabs client (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
 
 class VoiceSelectorAgent(BaseAgent):
@@ -98,21 +277,47 @@ class VoiceSelectorAgent(BaseAgent):
     name = "VoiceSelector"
     description = "Selects and configures the best ElevenLabs voice for the campaign"
 
-    async def _fetch_available_voices(self) -> list[dict[str, Any]]:
-        """Fetch available voices from ElevenLabs API."""
+    # Last fetched voice list: {"etag", "digest" (blake2b of the raw body),
+    # "voices" (simplified), "voices_json" (the same, serialized)}. Loaded
+    # from disk on first use and written back on change.
+    _voices_cache: dict[str, Any] | None = None
+
+    async def _fetch_voices(self) -> dict[str, Any]:
+        """Fetch available voices from ElevenLabs API as a voices cache record.
+
+        The list rarely changes: the request is revalidated with the cached
+        ETag (a 304 costs no body), and the simplified list is also reused
+        while the raw response body is byte-for-byte the same as last time.
+        """
         logger.info(f"[{self.name}] Fetching available voices from ElevenLabs")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{ELEVENLABS_BASE_URL}/v2/voices",
-                headers={"xi-api-key": ELEVENLABS_API_KEY},
-                params={"page_size": 100},
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-        voices = data.get("voices", [])
+        cached = VoiceSelectorAgent._voices_cache
+        if cached is None:
+            cached = VoiceSelectorAgent._voices_cache = _load_voices_cache()
+
+        headers = {"xi-api-key": ELEVENLABS_API_KEY}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        response = await _get_http_client().get(
+            f"{ELEVENLABS_BASE_URL}/v2/voices",
+            headers=headers,
+            params={"page_size": 100},
+        )
+        if response.status_code == 304 and cached:
+            logger.info(f"[{self.name}] Voice list not modified, using cached copy")
+            return cached
+        response.raise_for_status()
+
+        etag = response.headers.get("etag", "")
+        digest = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+        if cached and cached.get("digest") == digest:
+            logger.info(f"[{self.name}] Voice list unchanged, reusing serialized copy")
+            if cached.get("etag") != etag:
+                cached["etag"] = etag
+                _save_voices_cache(cached)
+            return cached
+
+        voices = response.json().get("voices", [])
         logger.info(f"[{self.name}] Found {len(voices)} available voices")
 
         # Extract relevant metadata for each voice
@@ -126,7 +331,15 @@ class VoiceSelectorAgent(BaseAgent):
                 "category": v.get("category", ""),
                 "preview_url": v.get("preview_url", ""),
             })
-        return simplified
+        cached = {
+            "etag": etag,
+            "digest": digest,
+            "voices": simplified,
+            "voices_json": json_dumps_indented(simplified),
+        }
+        VoiceSelectorAgent._voices_cache = cached
+        _save_voices_cache(cached)
+        return cached
 
     async def run(
         self,
@@ -149,62 +362,56 @@ class VoiceSelectorAgent(BaseAgent):
         """
         logger.info(f"[{self.name}] Selecting voice for {country}")
 
-        # Fetch available voices from ElevenLabs
-        try:
-            available_voices = await self._fetch_available_voices()
-        except Exception as e:
-            logger.error(f"[{self.name}] Failed to fetch voices: {e}")
-            # Provide a fallback with a known good multilingual voice
-            available_voices = [
-                {
-                    "voice_id": "JBFqnCBsd6RMkjVDRZzb",
-                    "name": "George",
-                    "description": "Warm, clear male voice suitable for narration",
-                    "labels": {"accent": "British", "gender": "male", "age": "middle-aged"},
-                    "category": "premade",
-                },
-                {
-                    "voice_id": "EXAVITQu4vr4xnSDxMaL",
-                    "name": "Sarah",
-                    "description": "Soft, friendly female voice",
-                    "labels": {"accent": "American", "gender": "female", "age": "young"},
-                    "category": "premade",
-                },
-            ]
-
         # Determine language from scripts or market analysis
         if not language:
             language = scripts.get("language_used", "")
             if not language:
                 lang_info = market_analysis.get("market_overview", {})
-                language = lang_info.get("dominant_language_for_promotions", "English")
+                language = lang_info.get("dominant_language_for_promotions") or "English"
+
+        # Fetch available voices from ElevenLabs
+        try:
+            catalog = await self._fetch_voices()
+        except Exception as e:
+            logger.error(f"[{self.name}] Failed to fetch voices: {e}")
+            voices_json = _CURATED_VOICES_JSON
+        else:
+            try:
+                shortlist = _shortlist_voices(catalog["voices"], country, language)
+            except Exception as e:
+                logger.warning(f"[{self.name}] Voice shortlisting failed, sending the full catalog: {e}")
+                shortlist = None
+            if shortlist is None or len(shortlist) == len(catalog["voices"]):
+                voices_json = catalog["voices_json"]
+            else:
+                logger.info(
+                    f"[{self.name}] Sending {len(shortlist)}/{len(catalog['voices'])} voices "
+                    f"matching {country}/{language}"
+                )
+                voices_json = json_dumps_indented(shortlist)
 
         user_prompt = f"""\
-Select the best voice for this OBD campaign:
+{SELECT_USER_PREAMBLE}
+
+--- AVAILABLE VOICES ---
+{voices_json}
 
 COUNTRY: {country}
 TARGET LANGUAGE: {language}
 
---- AVAILABLE VOICES ---
-{json.dumps(available_voices, indent=2)}
-
 --- SCRIPTS (for context on emotional range needed) ---
-{json.dumps(scripts.get("scripts", [])[:2], indent=2)}
+{json_dumps_indented(scripts.get("scripts", [])[:2])}
 
 --- MARKET ANALYSIS ---
-{json.dumps(market_analysis.get("promotion_recommendations", {}), indent=2)}
-{json.dumps(market_analysis.get("cultural_insights", {}), indent=2)}
-
-Select the voice that will be most effective for this specific market and these \
-scripts. Configure the V3 parameters for maximum expressiveness with audio tags.
-
-Output only valid JSON.\
+{json_dumps_indented(market_analysis.get("promotion_recommendations", {}))}
+{json_dumps_indented(market_analysis.get("cultural_insights", {}))}\
 """
 
         response = await self.call_llm(
             system_prompt=SYSTEM_PROMPT,
             user_prompt=user_prompt,
             max_tokens=4096,
+            response_format=VOICE_SELECTION_RESPONSE_FORMAT,
         )
 
         result = self.parse_json(response)
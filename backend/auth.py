@@ -2,33 +2,78 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import json
 import os
+import re
+import threading
 import time
 import logging
+from collections import OrderedDict
 from typing import Optional, Dict, Any
 
 import jwt
 from fastapi import Request, WebSocket
 from fastapi.responses import JSONResponse
+from starlette.requests import cookie_parser
 
 try:
     import bcrypt
 except ImportError:
     bcrypt = None  # type: ignore[assignment]
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 from backend.database import supabase
 from backend.config import SUPABASE_URL
 
 logger = logging.getLogger(__name__)
 
+# orjson.JSONDecodeError subclasses ValueError, like the stdlib's.
+_json_loads = orjson.loads if orjson else json.loads
+
 # ── Config ──
 JWT_SECRET = os.getenv("JWT_SECRET", "obd-superstar-default-secret-change-me").strip()
 JWT_ALGORITHM = "HS256"
+# Keyed once at import; verification copies it instead of re-deriving the
+# HMAC key pads for every token.
+_JWT_HMAC_TEMPLATE = hmac.new(JWT_SECRET.encode(), digestmod=hashlib.sha256)
 JWT_EXPIRY_HOURS = 72  # 3 days
+_JWT_EXPIRY_SECONDS = JWT_EXPIRY_HOURS * 3600
+
+# Seconds a verified token's payload is reused before jwt.decode runs again
+# (0 disables the cache). Clients send the same token on every request.
+JWT_CACHE_TTL = float(os.getenv("JWT_CACHE_TTL") or 5)
+_JWT_CACHE_MAX_ENTRIES = 10_000
+# Rejected tokens are remembered briefly so a client replaying a bad or
+# expired token gets its 401 without another signature check.
+_JWT_REJECT_TTL = 2.0
+_JWT_REJECT_MAX_ENTRIES = 50_000
+
+# bcrypt cost factor for new password hashes (existing hashes keep their own)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS") or 12)
+# Each bcrypt check pins a CPU for ~100ms; run them in threads, at most one
+# per core, so a burst of logins queues instead of stalling the event loop.
+_bcrypt_slots = asyncio.Semaphore(os.cpu_count() or 2)
+
+# Seconds a Supabase users row (or its absence) is reused for logins.
+# Admin changes call invalidate_user, so this only bounds staleness from
+# edits made outside the app.
+_USER_CACHE_TTL = 30.0
+_USER_CACHE_MAX_ENTRIES = 1024
 
 # Optional env-var fallback for local dev (single-user, no Supabase)
 _FALLBACK_USERNAME = os.getenv("LOGIN_USERNAME", "")
 _FALLBACK_PASSWORD = os.getenv("LOGIN_PASSWORD", "")
+_FALLBACK_USERNAME_BYTES = _FALLBACK_USERNAME.encode()
+_FALLBACK_PASSWORD_BYTES = _FALLBACK_PASSWORD.encode()
 
 PUBLIC_PATHS = {
     "/api/health",
@@ -36,6 +81,10 @@ PUBLIC_PATHS = {
     "/api/auth/me",
 }
 
+# Only these trees need a token; everything else is the frontend bundle.
+_PROTECTED_PREFIXES = ("/api/", "/ws/", "/outputs/")
+_ADMIN_PREFIX = "/api/admin/"
+
 def auth_enabled() -> bool:
     """Auth is enabled if Supabase is configured OR env-var fallback is set."""
     if SUPABASE_URL and supabase:
@@ -51,32 +100,74 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         hashed_password.encode("utf-8"),
     )
 
-def authenticate_user(username: str, password: str) -> Optional[Dict[str, Any]]:
+def hash_password(plain_password: str) -> str:
+    """Hash a password with bcrypt at BCRYPT_ROUNDS."""
+    return bcrypt.hashpw(
+        plain_password.encode("utf-8"),
+        bcrypt.gensalt(rounds=BCRYPT_ROUNDS),
+    ).decode("utf-8")
+
+# username -> (users row or None if absent, expires_at), oldest first
+_user_cache: OrderedDict[str, tuple[Optional[Dict[str, Any]], float]] = OrderedDict()
+
+def invalidate_user(username: Optional[str] = None) -> None:
+    """Drop a cached users row (all of them if username is None) after it changes."""
+    if username is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(username, None)
+
+# Only what login needs: the check itself plus the claims create_token signs
+_USER_LOGIN_COLUMNS = "id, username, password_hash, role, team, is_active"
+
+def _fetch_user(username: str) -> Optional[Dict[str, Any]]:
+    response = (
+        supabase.table("users")
+        .select(_USER_LOGIN_COLUMNS)
+        .eq("username", username)
+        .maybe_single()
+        .execute()
+    )
+    return response.data if response else None
+
+async def _get_user(username: str) -> Optional[Dict[str, Any]]:
+    """The users row for username, from the short-lived cache or Supabase."""
+    now = time.time()
+    cached = _user_cache.get(username)
+    if cached is not None and now < cached[1]:
+        return cached[0]
+    user_record = await asyncio.to_thread(_fetch_user, username)
+    _user_cache[username] = (user_record, now + _USER_CACHE_TTL)
+    _user_cache.move_to_end(username)
+    if len(_user_cache) > _USER_CACHE_MAX_ENTRIES:
+        _user_cache.popitem(last=False)
+    return user_record
+
+async def authenticate_user(username: str, password: str) -> Optional[Dict[str, Any]]:
     """Verify credentials against the Supabase users table or env-var fallback."""
     if supabase:
         try:
-            response = (
-                supabase.table("users")
-                .select("*")
-                .eq("username", username)
-                .maybe_single()
-                .execute()
-            )
-            user_record = response.data
+            user_record = await _get_user(username)
             if not user_record:
                 return None
             if not user_record.get("is_active", True):
                 logger.warning("Attempted login by deactivated user: %s", username)
                 return None
-            if verify_password(password, user_record["password_hash"]):
+            async with _bcrypt_slots:
+                valid = await asyncio.to_thread(verify_password, password, user_record["password_hash"])
+            if valid:
                 return user_record
             return None
         except Exception as e:
             logger.error("Error authenticating user %s: %s", username, e)
             return None
 
-    # Env-var fallback (local dev, no Supabase)
-    if _FALLBACK_USERNAME and username == _FALLBACK_USERNAME and password == _FALLBACK_PASSWORD:
+    # Env-var fallback (local dev, no Supabase). Both fields are always
+    # compared, in constant time, so timing reveals neither one.
+    if _FALLBACK_USERNAME and (
+        hmac.compare_digest(username.encode(), _FALLBACK_USERNAME_BYTES)
+        & hmac.compare_digest(password.encode(), _FALLBACK_PASSWORD_BYTES)
+    ):
         return {
             "id": "local",
             "username": _FALLBACK_USERNAME,
@@ -87,18 +178,111 @@ def authenticate_user(username: str, password: str) -> Optional[Dict[str, Any]]:
 
 def create_token(user: Dict[str, Any]) -> str:
     """Create a signed JWT token with user roles and team."""
+    now = int(time.time())
     payload = {
         "sub": user.get("username", "unknown"),
         "id": str(user.get("id", "local")),
         "role": user.get("role", "member"),
         "team": user.get("team", "default"),
-        "iat": int(time.time()),
-        "exp": int(time.time()) + (JWT_EXPIRY_HOURS * 3600),
+        "iat": now,
+        "exp": now + _JWT_EXPIRY_SECONDS,
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+# sha256(token) -> (payload, expires_at), least recently used first.
+# Keyed by digest so raw tokens are never held in memory longer than a request.
+_token_cache: OrderedDict[bytes, tuple[Dict[str, Any], float]] = OrderedDict()
+# sha256(token) -> expires_at for rejected tokens, oldest first. Kept apart
+# from _token_cache so a spray of bad tokens cannot evict valid sessions.
+_rejected_tokens: OrderedDict[bytes, float] = OrderedDict()
+_token_cache_lock = threading.Lock()
+
 def verify_token(token: str) -> Optional[Dict[str, Any]]:
-    """Verify a JWT token and return the payload, or None if invalid."""
+    """Verify a JWT token and return the payload, or None if invalid.
+
+    Valid payloads are cached for JWT_CACHE_TTL seconds (never past the
+    token's own exp), and rejections for _JWT_REJECT_TTL seconds, so
+    repeat requests skip the signature check.
+    """
+    if JWT_CACHE_TTL <= 0:
+        return _decode_token(token)
+
+    key = hashlib.sha256(token.encode()).digest()
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+        if cached is not None:
+            if now < cached[1]:
+                _token_cache.move_to_end(key)
+                return cached[0]
+            del _token_cache[key]
+        rejected_until = _rejected_tokens.get(key)
+        if rejected_until is not None:
+            if now < rejected_until:
+                return None
+            del _rejected_tokens[key]
+
+    payload = _decode_token(token)
+    if payload is None:
+        with _token_cache_lock:
+            _rejected_tokens[key] = now + _JWT_REJECT_TTL
+            if len(_rejected_tokens) > _JWT_REJECT_MAX_ENTRIES:
+                _rejected_tokens.popitem(last=False)
+        return None
+    expires_at = min(float(payload.get("exp", now + JWT_CACHE_TTL)), now + JWT_CACHE_TTL)
+    with _token_cache_lock:
+        _token_cache[key] = (payload, expires_at)
+        if len(_token_cache) > _JWT_CACHE_MAX_ENTRIES:
+            _token_cache.popitem(last=False)
+    return payload
+
+# Unpadded base64url, as JWT segments are; urlsafe_b64decode would silently
+# skip any other characters instead of rejecting the token
+_B64URL_SEGMENT = re.compile(r"[A-Za-z0-9_-]*")
+
+
+def _b64url_decode(segment: str) -> bytes:
+    if not _B64URL_SEGMENT.fullmatch(segment):
+        raise ValueError("JWT segment is not base64url")
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _fast_verify_hs256(token: str) -> Optional[Dict[str, Any]]:
+    """Verify one of our own HS256 tokens without PyJWT's per-call machinery.
+
+    Returns the payload only when the token is definitely valid; anything
+    else (bad signature, expiry, other algorithms or claims this check does
+    not handle) returns None so jwt.decode gives the authoritative answer.
+    """
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = _json_loads(_b64url_decode(header_b64))
+        if not isinstance(header, dict) or header.get("alg") != "HS256" or header.keys() - {"alg", "typ"}:
+            return None
+        mac = _JWT_HMAC_TEMPLATE.copy()
+        mac.update(f"{header_b64}.{payload_b64}".encode())
+        if not hmac.compare_digest(mac.digest(), _b64url_decode(signature_b64)):
+            return None
+        payload = _json_loads(_b64url_decode(payload_b64))
+    except (ValueError, binascii.Error):
+        return None
+
+    if not isinstance(payload, dict) or "nbf" in payload or "aud" in payload:
+        return None
+    now = time.time()
+    exp = payload.get("exp")
+    if exp is not None and (type(exp) not in (int, float) or exp <= now):
+        return None
+    iat = payload.get("iat")
+    if iat is not None and (type(iat) is not int or iat > now):
+        return None
+    return payload
+
+
+def _decode_token(token: str) -> Optional[Dict[str, Any]]:
+    payload = _fast_verify_hs256(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         return payload
@@ -110,15 +294,26 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
         return None
 
 def get_token_from_request(request: Request) -> Optional[str]:
-    """Extract JWT token from cookie or Authorization header."""
+    """Extract JWT token from cookie or Authorization header.
+
+    Reads the raw ASGI headers rather than request.headers, and only parses
+    the Cookie header (with Starlette's own parser, so quoted values unquote
+    the same way as request.cookies) when it mentions the token.
+    """
+    cookie = authorization = b""
+    for name, value in request.scope["headers"]:
+        if name == b"cookie" and not cookie:
+            cookie = value
+        elif name == b"authorization" and not authorization:
+            authorization = value
     # Try cookie first
-    token = request.cookies.get("obd_token")
-    if token:
-        return token
+    if b"obd_token" in cookie:
+        token = cookie_parser(cookie.decode("latin-1")).get("obd_token")
+        if token:
+            return token
     # Try Authorization header
-    auth_header = request.headers.get("authorization", "")
-    if auth_header.startswith("Bearer "):
-        return auth_header[7:]
+    if authorization.startswith(b"Bearer "):
+        return authorization[7:].decode("latin-1")
     return None
 
 def get_token_from_websocket(ws: WebSocket) -> Optional[str]:
@@ -136,18 +331,18 @@ async def auth_middleware(request: Request, call_next):
 
     Skips auth if Supabase is not configured (local dev fallback).
     """
-    path = request.url.path
+    path = request.scope["path"]  # always present for HTTP scopes; request.url builds a URL object
 
     # Skip auth if not enabled (local dev without credentials)
     if not auth_enabled():
         return await call_next(request)
 
-    # Skip public paths
-    if path in PUBLIC_PATHS:
+    # Skip non-API paths (frontend static files, etc.)
+    if not path.startswith(_PROTECTED_PREFIXES):
         return await call_next(request)
 
-    # Skip non-API paths (frontend static files, etc.)
-    if not path.startswith("/api/") and not path.startswith("/ws/") and not path.startswith("/outputs/"):
+    # Skip public paths
+    if path in PUBLIC_PATHS:
         return await call_next(request)
 
     # Verify token
@@ -170,7 +365,7 @@ async def auth_middleware(request: Request, call_next):
     request.state.username = payload.get("sub")
     
     # Admin route guard
-    if path.startswith("/api/admin/") and payload.get("role") != "admin":
+    if path.startswith(_ADMIN_PREFIX) and payload.get("role") != "admin":
         return JSONResponse(
             status_code=403,
             content={"error": "Admin privileges required"},
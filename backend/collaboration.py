@@ -3,20 +3,84 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
+import json
 import logging
 import time
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import Any, Coroutine, Optional
 
 from fastapi import WebSocket
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
 
+def encode_event(event: dict[str, Any]) -> str:
+    """Serialize an event once for every socket it goes to.
+
+    Same compact, non-ASCII-preserving output as WebSocket.send_json; it is
+    sent as a text frame because the frontend JSON.parses event.data.
+    """
+    if orjson is not None:
+        return orjson.dumps(event, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(event, separators=(",", ":"), ensure_ascii=False)
+
+
+# Broadcasts started by HTTP handlers; referenced until done so they are not GC'd
+_pending_broadcasts: set[asyncio.Task[None]] = set()
+
+
+def broadcast_in_background(broadcast: Coroutine[Any, Any, None]) -> None:
+    """Schedule a broadcast so the calling request can respond without waiting on sockets."""
+    task = asyncio.create_task(broadcast)
+    _pending_broadcasts.add(task)
+    task.add_done_callback(_pending_broadcasts.discard)
+
+
+# Sockets sent to per gather(); the loop gets a turn between batches so a
+# large fan-out cannot starve other tasks
+FANOUT_BATCH_SIZE = 50
+
+
+async def fan_out(sockets: list[WebSocket], message: str) -> list[WebSocket]:
+    """Send message to every socket concurrently; return the sockets that failed.
+
+    A slow client no longer holds up delivery to the rest, and sockets are
+    sent to in batches of FANOUT_BATCH_SIZE with a yield to the event loop
+    in between.
+    """
+    dead: list[WebSocket] = []
+    for start in range(0, len(sockets), FANOUT_BATCH_SIZE):
+        if start:
+            await asyncio.sleep(0)
+        batch = sockets[start:start + FANOUT_BATCH_SIZE]
+        results = await asyncio.gather(
+            *(ws.send_text(message) for ws in batch),
+            return_exceptions=True,
+        )
+        dead.extend(ws for ws, result in zip(batch, results) if isinstance(result, Exception))
+    return dead
+
+
+async def _send_all(targets: list[tuple[str, WebSocket]], message: str) -> list[str]:
+    """fan_out to (ws_id, socket) pairs; return the ws_ids that failed."""
+    dead = await fan_out([ws for _, ws in targets], message)
+    if not dead:
+        return []
+    dead_sockets = set(dead)
+    return [ws_id for ws_id, ws in targets if ws in dead_sockets]
+
+
 # ── Presence ──────────────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class PresenceUser:
     """Represents an online user."""
     username: str
@@ -45,14 +109,11 @@ AVATAR_COLORS = [
 _presence: dict[str, PresenceUser] = {}
 # Map ws_id -> WebSocket for broadcasting
 _presence_sockets: dict[str, WebSocket] = {}
-_color_index = 0
+_colors = itertools.cycle(AVATAR_COLORS)
 
 
 def _next_color() -> str:
-    global _color_index
-    color = AVATAR_COLORS[_color_index % len(AVATAR_COLORS)]
-    _color_index += 1
-    return color
+    return next(_colors)
 
 
 def register_user(ws_id: str, username: str, ws: WebSocket) -> PresenceUser:
@@ -98,23 +159,21 @@ def get_users_viewing_campaign(campaign_id: str) -> list[dict[str, Any]]:
 
 # ── Collaboration Rooms ──────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class CollaborationRoom:
     """A WebSocket room for a specific campaign."""
     campaign_id: str
     subscribers: dict[str, WebSocket] = field(default_factory=dict)  # ws_id -> WebSocket
 
-    async def broadcast(self, event: dict[str, Any], exclude_ws_id: Optional[str] = None) -> None:
-        """Send an event to all subscribers in this room."""
-        message = event
-        dead_ids = []
-        for ws_id, ws in self.subscribers.items():
-            if ws_id == exclude_ws_id:
-                continue
-            try:
-                await ws.send_json(message)
-            except Exception:
-                dead_ids.append(ws_id)
+    async def broadcast(self, event: dict[str, Any] | str, exclude_ws_id: Optional[str] = None) -> None:
+        """Send an event to all subscribers in this room.
+
+        event may already be encoded with encode_event, for messages a
+        connection sends repeatedly.
+        """
+        targets = [(ws_id, ws) for ws_id, ws in self.subscribers.items() if ws_id != exclude_ws_id]
+        message = event if isinstance(event, str) else encode_event(event)
+        dead_ids = await _send_all(targets, message)
         for ws_id in dead_ids:
             self.subscribers.pop(ws_id, None)
 
@@ -151,8 +210,8 @@ def cleanup_room(campaign_id: str) -> None:
 # ── Activity Events ──────────────────────────────────────────────────────────
 
 # In-memory activity feed (last N events)
-_activity_feed: list[dict[str, Any]] = []
 MAX_ACTIVITY_ITEMS = 50
+_activity_feed: deque[dict[str, Any]] = deque(maxlen=MAX_ACTIVITY_ITEMS)
 
 
 def record_activity(
@@ -172,25 +231,18 @@ def record_activity(
         "detail": detail,
         "timestamp": time.time(),
     }
-    _activity_feed.insert(0, event)
-    if len(_activity_feed) > MAX_ACTIVITY_ITEMS:
-        _activity_feed.pop()
+    _activity_feed.appendleft(event)  # maxlen drops the oldest
     return event
 
 
 def get_recent_activity(limit: int = 20) -> list[dict[str, Any]]:
     """Get the most recent activity events."""
-    return _activity_feed[:limit]
+    return list(itertools.islice(_activity_feed, max(limit, 0)))
 
 
 async def broadcast_to_all(event: dict[str, Any]) -> None:
     """Broadcast an event to ALL connected presence sockets."""
-    dead_ids = []
-    for ws_id, ws in _presence_sockets.items():
-        try:
-            await ws.send_json(event)
-        except Exception:
-            dead_ids.append(ws_id)
+    dead_ids = await _send_all(list(_presence_sockets.items()), encode_event(event))
     for ws_id in dead_ids:
         _presence_sockets.pop(ws_id, None)
         _presence.pop(ws_id, None)
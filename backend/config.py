@@ -22,6 +22,11 @@ AZURE_OPENAI_API_VERSION = _env("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"
 # --- Default Provider ---
 DEFAULT_LLM_PROVIDER = _env("DEFAULT_LLM_PROVIDER", "azure_openai")
 
+# --- LLM Admission Control ---
+LLM_MAX_CONCURRENCY = int(_env("OBD_LLM_CONCURRENCY", "8"))  # In-flight LLM calls per process
+LLM_MAX_RETRIES = 5  # Attempts per call when the provider rate-limits (429)
+LLM_BACKOFF_CAP_SECONDS = 30.0
+
 # --- ElevenLabs Configuration ---
 ELEVENLABS_API_KEY = _env("ELEVENLABS_API_KEY")
 ELEVENLABS_BASE_URL = "https://api.elevenlabs.io"
@@ -34,11 +39,15 @@ MURF_API_KEY = _env("MURF_API_KEY")
 # --- App Configuration ---
 OUTPUTS_DIR = Path(__file__).parent / "outputs"
 OUTPUTS_DIR.mkdir(exist_ok=True)
+# Small on-disk caches (e.g. the ElevenLabs voice catalog with its ETag)
+CACHE_DIR = Path(_env("OBD_CACHE_DIR") or Path.home() / ".cache" / "obd")
 
 MAX_SCRIPT_WORDS = 75  # ~30 seconds at normal speaking pace
 EVAL_FEEDBACK_ROUNDS = 1  # Number of revision cycles between Writer and Eval Panel
 NUM_SCRIPT_VARIANTS = 5  # Number of script sets to generate
 NUM_FALLBACKS_PER_SCRIPT = 2  # Fallback CTA variants per script
+# Generate all variants in one streamed LLM call (batches cover any it misses)
+SCRIPT_WRITER_SINGLE_CALL = _env("SCRIPT_WRITER_SINGLE_CALL", "false").lower() in ("1", "true", "yes")
 
 # --- Supabase Configuration ---
 SUPABASE_URL = _env("SUPABASE_URL")
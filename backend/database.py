@@ -2,17 +2,62 @@
 
 from __future__ import annotations
 
+import copy
 import json
 import logging
 import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from backend.config import SUPABASE_URL, SUPABASE_SERVICE_KEY
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
+
+def _dump_result(result: dict[str, Any]) -> bytes:
+    """Serialize a pipeline result for the SQLite result_json column.
+
+    Pipeline results run to hundreds of KB, where orjson is several times
+    faster. Unknown types are stringified either way. The JSON is stored
+    zlib-compressed as a BLOB; SQLite keeps BLOBs as-is in the TEXT column.
+    """
+    if orjson is not None:
+        raw = orjson.dumps(result, default=str, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        raw = json.dumps(result, default=str).encode()
+    return zlib.compress(raw, 3)
+
+
+_json_loads = orjson.loads if orjson else json.loads
+
+
+def _now_iso() -> str:
+    """Current UTC time for created_at columns.
+
+    Fixed millisecond precision keeps every value the same width, so the
+    TEXT columns in SQLite sort chronologically. isoformat() drops the
+    fraction entirely when microseconds happen to be zero.
+    """
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _load_result(stored: bytes | str) -> dict[str, Any]:
+    """Parse a result_json value; rows saved before compression are plain TEXT."""
+    if isinstance(stored, bytes):
+        stored = zlib.decompress(stored)
+    return _json_loads(stored)
+
 # --- Supabase Setup ---
 supabase: Optional[Any] = None
 if SUPABASE_URL and SUPABASE_SERVICE_KEY:
@@ -30,11 +75,40 @@ if SUPABASE_URL and SUPABASE_SERVICE_KEY:
 # --- SQLite Fallback Setup ---
 DB_PATH = Path(__file__).parent / "campaigns.db"
 
+# One connection for the process instead of a connect/close per query.
+# Calls may come from worker threads, so access is serialized by the lock.
+_sqlite_conn: Optional[sqlite3.Connection] = None
+_sqlite_lock = threading.RLock()
+
 def _get_sqlite_conn() -> sqlite3.Connection:
-    """Get a SQLite connection with row factory."""
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get the shared SQLite connection, opening and tuning it on first use."""
+    global _sqlite_conn
+    if _sqlite_conn is None:
+        conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # WAL commits append to the log instead of rewriting pages, and with
+        # NORMAL sync they survive app crashes without an fsync per commit.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")  # 64 MB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        # Lets campaign_comments' ON DELETE CASCADE remove a campaign's comments
+        conn.execute("PRAGMA foreign_keys=ON")
+        _sqlite_conn = conn
+    return _sqlite_conn
+
+@contextmanager
+def _sqlite() -> Iterator[sqlite3.Connection]:
+    """Hold the shared connection for one transaction.
+
+    Commits when the block exits normally and rolls back if it raises, so
+    multi-statement writes land with a single commit.
+    """
+    with _sqlite_lock:
+        conn = _get_sqlite_conn()
+        with conn:
+            yield conn
 
 def init_db() -> None:
     """Initialize database tables (SQLite fallback only)."""
@@ -42,8 +116,10 @@ def init_db() -> None:
         logger.info("Using Supabase. Skipping local SQLite init.")
         return
 
-    conn = _get_sqlite_conn()
-    try:
+    with _sqlite() as conn:
+        # sqlite3 runs DDL outside a transaction unless one is open; open one
+        # so the schema is created in a single commit.
+        conn.execute("BEGIN")
         conn.execute("""
             CREATE TABLE IF NOT EXISTS campaigns (
                 id TEXT PRIMARY KEY,
@@ -69,13 +145,35 @@ def init_db() -> None:
                 FOREIGN KEY (campaign_id) REFERENCES campaigns(id) ON DELETE CASCADE
             )
         """)
-        conn.commit()
-        logger.info("Local SQLite database initialized at %s", DB_PATH)
-    finally:
-        conn.close()
+        # list_campaigns orders by created_at; list_comments and
+        # delete_campaign look comments up by campaign
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_campaigns_created_at ON campaigns (created_at DESC)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_comments_campaign_created "
+            "ON campaign_comments (campaign_id, created_at DESC)"
+        )
+    logger.info("Local SQLite database initialized at %s", DB_PATH)
 
 # ── Campaigns ─────────────────────────────────────────────────────────────────
 
+_CAMPAIGN_SUMMARY_COLUMNS = (
+    "id", "name", "created_by", "team", "created_at",
+    "country", "telco", "language", "script_count", "has_audio",
+)
+_SQL_LIST_CAMPAIGNS = (
+    f"SELECT {', '.join(_CAMPAIGN_SUMMARY_COLUMNS)} FROM campaigns ORDER BY created_at DESC LIMIT ?"
+)
+# Parameters: the summary columns in order, then result_json
+_SQL_UPSERT_CAMPAIGN = (
+    f"INSERT INTO campaigns ({', '.join(_CAMPAIGN_SUMMARY_COLUMNS)}, result_json) "
+    f"VALUES ({', '.join('?' * (len(_CAMPAIGN_SUMMARY_COLUMNS) + 1))}) "
+    "ON CONFLICT (id) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in (*_CAMPAIGN_SUMMARY_COLUMNS[1:], "result_json"))
+)
+
+
 def save_campaign(
     campaign_id: str,
     name: str,
@@ -87,89 +185,130 @@ def save_campaign(
     team: str = "default",  # Optional param for future use
 ) -> dict[str, Any]:
     """Save a campaign to the database. Returns the saved campaign summary."""
-    final_scripts = result.get("final_scripts", result.get("revised_scripts_round_1", result.get("initial_scripts", {})))
-    scripts = final_scripts.get("scripts", [])
-    script_count = len(scripts)
+    final_scripts = (
+        result.get("final_scripts")
+        or result.get("revised_scripts_round_1")
+        or result.get("initial_scripts")
+        or {}
+    )
+    script_count = len(final_scripts.get("scripts", []))
     audio_files = result.get("audio", {}).get("audio_files", [])
-    has_audio = 1 if any(not f.get("error") for f in audio_files) else 0
-
-    now = datetime.now(timezone.utc).isoformat()
-    result_json = result
-
-    campaign_data = {
-        "id": campaign_id,
-        "name": name,
-        "created_by": created_by,
-        "team": team,
-        "created_at": now,
-        "country": country,
-        "telco": telco,
-        "language": language,
-        "result_json": result_json,
-        "script_count": script_count,
-        "has_audio": bool(has_audio),
-    }
+    has_audio = any(not f.get("error") for f in audio_files)
+
+    summary = dict(zip(_CAMPAIGN_SUMMARY_COLUMNS, (
+        campaign_id, name, created_by, team, _now_iso(),
+        country, telco, language, script_count, has_audio,
+    )))
 
     if supabase:
         try:
-            supabase.table("campaigns").upsert(campaign_data).execute()
+            supabase.table("campaigns").upsert({**summary, "result_json": result}).execute()
             logger.info("Saved campaign '%s' to Supabase", name)
         except Exception as e:
             logger.error("Failed to save campaign to Supabase: %s", e)
             raise e
     else:
-        conn = _get_sqlite_conn()
-        try:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO campaigns
-                    (id, name, created_by, team, created_at, country, telco, language, result_json, script_count, has_audio)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (campaign_id, name, created_by, team, now, country, telco, language, json.dumps(result_json, default=str), script_count, has_audio),
-            )
-            conn.commit()
+        with _sqlite() as conn:
+            conn.execute(_SQL_UPSERT_CAMPAIGN, (*summary.values(), _dump_result(result)))
             logger.info("Saved campaign '%s' to SQLite", name)
-        finally:
-            conn.close()
 
-    # Drop result_json from returned summary
-    summary = campaign_data.copy()
-    summary.pop("result_json")
+    _invalidate_campaign(campaign_id)
     return summary
 
 
+# campaign_id -> (campaign, expires_at), least recently used first. Saved
+# campaigns are re-read by the detail page, script downloads and comments;
+# the app runs as a single process, and save/delete invalidate entries.
+_CAMPAIGN_CACHE_TTL = 300.0
+_CAMPAIGN_CACHE_MAX_ENTRIES = 64  # results can be hundreds of KB each
+_campaign_cache: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+_campaign_cache_lock = threading.Lock()
+
+# limit -> (campaign summaries, expires_at). Any save or delete clears it, so
+# the TTL only bounds staleness from writes made outside this process.
+_CAMPAIGN_LIST_TTL = 60.0
+_campaign_list_cache: dict[int, tuple[list[dict[str, Any]], float]] = {}
+_campaign_writes = 0  # bumped on every invalidation, to drop reads that raced a write
+
+def _invalidate_campaign(campaign_id: str) -> None:
+    global _campaign_writes
+    with _campaign_cache_lock:
+        _campaign_cache.pop(campaign_id, None)
+        _campaign_list_cache.clear()
+        _campaign_writes += 1
+
+
 def list_campaigns(limit: int = 50) -> list[dict[str, Any]]:
     """List all campaigns (without full result JSON)."""
+    now = time.monotonic()
+    with _campaign_cache_lock:
+        cached = _campaign_list_cache.get(limit)
+        writes = _campaign_writes
+    if cached is not None and now < cached[1]:
+        return list(cached[0])
+
+    campaigns = _fetch_campaign_list(limit)
+    if campaigns is None:
+        return []
+    with _campaign_cache_lock:
+        if writes == _campaign_writes:
+            if len(_campaign_list_cache) >= 8:  # limit comes from the query string
+                _campaign_list_cache.clear()
+            _campaign_list_cache[limit] = (campaigns, now + _CAMPAIGN_LIST_TTL)
+    return list(campaigns)
+
+
+def _fetch_campaign_list(limit: int) -> Optional[list[dict[str, Any]]]:
+    """Campaign summaries, newest first, or None if Supabase could not be read."""
     if supabase:
         try:
             response = supabase.table("campaigns").select(
-                "id, name, created_by, team, created_at, country, telco, language, script_count, has_audio"
+                ", ".join(_CAMPAIGN_SUMMARY_COLUMNS)
             ).order("created_at", desc=True).limit(limit).execute()
             return response.data
         except Exception as e:
             logger.error("Failed to list campaigns from Supabase: %s", e)
-            return []
+            return None
 
-    conn = _get_sqlite_conn()
-    try:
-        rows = conn.execute(
-            """
-            SELECT id, name, created_by, team, created_at, country, telco, language, script_count, has_audio
-            FROM campaigns
-            ORDER BY created_at DESC LIMIT ?
-            """, (limit,)
-        ).fetchall()
-        return [dict(row) for row in rows]
-    finally:
-        conn.close()
+    with _sqlite() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None  # plain tuples; the columns are known
+        cursor.execute(_SQL_LIST_CAMPAIGNS, (limit,))
+        campaigns = [dict(zip(_CAMPAIGN_SUMMARY_COLUMNS, row)) for row in cursor]
+        for campaign in campaigns:
+            campaign["has_audio"] = bool(campaign["has_audio"])  # as Supabase returns it
+        return campaigns
 
 
 def get_campaign(campaign_id: str) -> Optional[dict[str, Any]]:
     """Get a single campaign with full result JSON.
 
     Returns dict with ``result`` key (not ``result_json``) for consistency.
+    Recently read campaigns are served from memory for a few minutes; each
+    caller gets its own deep copy, so mutating it can't touch the cache.
     """
+    now = time.monotonic()
+    with _campaign_cache_lock:
+        cached = _campaign_cache.get(campaign_id)
+        writes = _campaign_writes
+        if cached is not None and now < cached[1]:
+            _campaign_cache.move_to_end(campaign_id)
+            return copy.deepcopy(cached[0])
+
+    data = _fetch_campaign(campaign_id)
+    if data is None:
+        return None
+    with _campaign_cache_lock:
+        # A save or delete during the read may have made data stale
+        if writes == _campaign_writes:
+            _campaign_cache[campaign_id] = (data, now + _CAMPAIGN_CACHE_TTL)
+            _campaign_cache.move_to_end(campaign_id)
+            if len(_campaign_cache) > _CAMPAIGN_CACHE_MAX_ENTRIES:
+                _campaign_cache.popitem(last=False)
+    return copy.deepcopy(data)
+
+
+def _fetch_campaign(campaign_id: str) -> Optional[dict[str, Any]]:
     if supabase:
         try:
             response = supabase.table("campaigns").select("*").eq("id", campaign_id).maybe_single().execute()
@@ -182,36 +321,33 @@ def get_campaign(campaign_id: str) -> Optional[dict[str, Any]]:
             logger.error("Failed to get campaign from Supabase: %s", e)
             return None
 
-    conn = _get_sqlite_conn()
-    try:
+    with _sqlite() as conn:
         row = conn.execute("SELECT * FROM campaigns WHERE id = ?", (campaign_id,)).fetchone()
         if not row:
             return None
         data = dict(row)
-        data["result"] = json.loads(data.pop("result_json"))
+        data["result"] = _load_result(data.pop("result_json"))
         return data
-    finally:
-        conn.close()
 
 
 def delete_campaign(campaign_id: str) -> bool:
     """Delete a campaign and its comments. Returns True if a row was deleted."""
-    if supabase:
-        try:
-            response = supabase.table("campaigns").delete().eq("id", campaign_id).execute()
-            return len(response.data) > 0
-        except Exception as e:
-            logger.error("Failed to delete campaign from Supabase: %s", e)
-            return False
-
-    conn = _get_sqlite_conn()
     try:
-        conn.execute("DELETE FROM campaign_comments WHERE campaign_id = ?", (campaign_id,))
-        cursor = conn.execute("DELETE FROM campaigns WHERE id = ?", (campaign_id,))
-        conn.commit()
-        return cursor.rowcount > 0
+        if supabase:
+            try:
+                response = supabase.table("campaigns").delete().eq("id", campaign_id).execute()
+                return len(response.data) > 0
+            except Exception as e:
+                logger.error("Failed to delete campaign from Supabase: %s", e)
+                return False
+
+        with _sqlite() as conn:
+            # Comments go with it via ON DELETE CASCADE
+            cursor = conn.execute("DELETE FROM campaigns WHERE id = ?", (campaign_id,))
+            return cursor.rowcount > 0
     finally:
-        conn.close()
+        # After the delete, so a read that raced it can't re-cache the row
+        _invalidate_campaign(campaign_id)
 
 
 # ── Campaign Comments ─────────────────────────────────────────────────────────
@@ -223,13 +359,12 @@ def save_comment(
     text: str,
 ) -> dict[str, Any]:
     """Save a comment on a campaign."""
-    now = datetime.now(timezone.utc).isoformat()
     comment_data = {
         "id": comment_id,
         "campaign_id": campaign_id,
         "username": username,
         "text": text,
-        "created_at": now,
+        "created_at": _now_iso(),
     }
 
     if supabase:
@@ -239,15 +374,11 @@ def save_comment(
             logger.error("Failed to save comment to Supabase: %s", e)
             raise e
     else:
-        conn = _get_sqlite_conn()
-        try:
+        with _sqlite() as conn:
             conn.execute(
                 "INSERT INTO campaign_comments (id, campaign_id, username, text, created_at) VALUES (?, ?, ?, ?, ?)",
-                (comment_id, campaign_id, username, text, now),
+                (comment_id, campaign_id, username, text, comment_data["created_at"]),
             )
-            conn.commit()
-        finally:
-            conn.close()
 
     return comment_data
 
@@ -262,15 +393,17 @@ def list_comments(campaign_id: str) -> list[dict[str, Any]]:
             logger.error("Failed to list comments from Supabase: %s", e)
             return []
 
-    conn = _get_sqlite_conn()
-    try:
-        rows = conn.execute(
+    with _sqlite() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None  # plain tuples; the columns are known
+        cursor.execute(
             "SELECT id, campaign_id, username, text, created_at FROM campaign_comments WHERE campaign_id = ? ORDER BY created_at DESC",
             (campaign_id,),
-        ).fetchall()
-        return [dict(row) for row in rows]
-    finally:
-        conn.close()
+        )
+        return [
+            {"id": id_, "campaign_id": campaign_id_, "username": username, "text": text, "created_at": created_at}
+            for id_, campaign_id_, username, text, created_at in cursor
+        ]
 
 
 def delete_comment(comment_id: str) -> bool:
@@ -283,10 +416,6 @@ def delete_comment(comment_id: str) -> bool:
             logger.error("Failed to delete comment from Supabase: %s", e)
             return False
 
-    conn = _get_sqlite_conn()
-    try:
+    with _sqlite() as conn:
         cursor = conn.execute("DELETE FROM campaign_comments WHERE id = ?", (comment_id,))
-        conn.commit()
         return cursor.rowcount > 0
-    finally:
-        conn.close()
@@ -6,16 +6,33 @@ import asyncio
 import json
 import logging
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, BinaryIO, Optional
 
 from fastapi import FastAPI, File, Form, Request, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
 
+# Document parsers are imported up front so the first upload does not pay
+# for loading them
+import docx
+import pdfplumber
+from pptx import Presentation
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None  # type: ignore[assignment]
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 from backend.auth import (
     auth_enabled,
     auth_middleware,
@@ -23,6 +40,8 @@ from backend.auth import (
     get_token_from_websocket,
     verify_token,
     authenticate_user,
+    hash_password,
+    invalidate_user,
 )
 from backend.config import OUTPUTS_DIR
 from backend.database import (
@@ -44,9 +63,14 @@ from backend.collaboration import (
     get_or_create_room,
     cleanup_room,
     record_activity,
+    encode_event,
+    fan_out,
     get_recent_activity,
     broadcast_to_all,
+    broadcast_in_background,
 )
+from backend.agents.base import json_dumps_indented
+from backend.agents.voice_selector import aclose_http_client as aclose_voice_http_client
 from backend.orchestrator import PipelineOrchestrator
 
 # ── Logging ──
@@ -57,10 +81,24 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # ── App ──
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed.
+
+    Session results and progress logs run to tens of KB and are re-sent on
+    every status poll.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
 app = FastAPI(
     title="OBD SuperStar Agent",
     description="Multi-agent AI system for generating OBD promotional scripts and audio",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 # CORS -- allow local dev and production frontend
@@ -93,20 +131,47 @@ sessions: dict[str, dict[str, Any]] = {}
 
 # ── Background pipeline tracker ──
 
+# Progress events kept per pipeline for catch-up; a run emits a few dozen,
+# so this only bounds a runaway one
+MAX_PROGRESS_EVENTS = 500
+
+
 @dataclass
 class PipelineState:
     """Tracks a running or completed pipeline."""
     session_id: str
     status: str = "running"  # running | done | error
-    progress_log: list[dict[str, Any]] = field(default_factory=list)
+    progress_log: deque[dict[str, Any]] = field(default_factory=lambda: deque(maxlen=MAX_PROGRESS_EVENTS))
+    # progress_log, encoded for catch-up
+    progress_frames: deque[str] = field(default_factory=lambda: deque(maxlen=MAX_PROGRESS_EVENTS))
     result: Optional[dict[str, Any]] = None
     error_message: str = ""
     task: Optional[asyncio.Task] = None  # type: ignore[type-arg]
-    subscribers: list[WebSocket] = field(default_factory=list)
+    subscribers: set[WebSocket] = field(default_factory=set)
 
 pipelines: dict[str, PipelineState] = {}
 
 
+async def _publish_progress(state: PipelineState, msg: dict[str, Any]) -> None:
+    """Log msg and send it to every live subscriber of a pipeline, dropping those that fail.
+
+    msg is encoded once, for all subscribers and for later catch-up replays.
+    """
+    frame = encode_event(msg)
+    state.progress_log.append(msg)
+    state.progress_frames.append(frame)
+    if not state.subscribers:
+        return
+    dead = await fan_out(list(state.subscribers), frame)
+    state.subscribers.difference_update(dead)
+
+
+async def _close_subscribers(state: PipelineState) -> None:
+    """Close the progress sockets of a finished pipeline, as catch-up does for late joiners."""
+    subscribers, state.subscribers = state.subscribers, set()
+    await asyncio.gather(*(ws.close() for ws in subscribers), return_exceptions=True)
+
+
 async def _run_pipeline_bg(
     state: PipelineState,
     product_text: str,
@@ -128,16 +193,8 @@ async def _run_pipeline_bg(
                 if k != "message" and _is_json_serializable(v)
             },
         }
-        state.progress_log.append(msg)
         # Broadcast to any connected WebSocket subscribers
-        dead: list[WebSocket] = []
-        for ws in state.subscribers:
-            try:
-                await ws.send_json(msg)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
-            state.subscribers.remove(ws)
+        await _publish_progress(state, msg)
 
     try:
         orchestrator = PipelineOrchestrator(
@@ -171,15 +228,7 @@ async def _run_pipeline_bg(
             "session_id": session_id,
             "result": state.result,
         }
-        state.progress_log.append(done_msg)
-        dead = []
-        for ws in state.subscribers:
-            try:
-                await ws.send_json(done_msg)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
-            state.subscribers.remove(ws)
+        await _publish_progress(state, done_msg)
 
     except Exception as e:
         logger.exception(f"Background pipeline error: {e}")
@@ -190,12 +239,9 @@ async def _run_pipeline_bg(
             "status": "error",
             "message": str(e),
         }
-        state.progress_log.append(err_msg)
-        for ws in list(state.subscribers):
-            try:
-                await ws.send_json(err_msg)
-            except Exception:
-                pass
+        await _publish_progress(state, err_msg)
+
+    await _close_subscribers(state)
 
 
 # ── REST Endpoints ──
@@ -217,7 +263,7 @@ async def login(request: Request):
     username = body.get("username", "")
     password = body.get("password", "")
 
-    user = authenticate_user(username, password)
+    user = await authenticate_user(username, password)
     if user:
         token = create_token(user)
         response = JSONResponse(content={
@@ -297,7 +343,6 @@ async def list_users():
 async def create_user(request: Request):
     """Create a new user (Admin only)."""
     from backend.database import supabase
-    import bcrypt
     
     if not supabase:
         return {"error": "Supabase not configured"}
@@ -312,8 +357,7 @@ async def create_user(request: Request):
     if not username or not email or not password:
         return JSONResponse(status_code=400, content={"error": "Missing required fields"})
         
-    salt = bcrypt.gensalt()
-    password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    password_hash = await asyncio.to_thread(hash_password, password)
     
     try:
         user_data = {
@@ -325,6 +369,7 @@ async def create_user(request: Request):
             "is_active": True
         }
         res = supabase.table("users").insert(user_data).execute()
+        invalidate_user(username)
         
         # Log action
         admin_username = getattr(request.state, "username", "unknown")
@@ -347,7 +392,6 @@ async def create_user(request: Request):
 async def update_user(user_id: str, request: Request):
     """Update a user (Admin only)."""
     from backend.database import supabase
-    import bcrypt
     
     if not supabase:
         return {"error": "Supabase not configured"}
@@ -359,14 +403,14 @@ async def update_user(user_id: str, request: Request):
     if "team" in body: updates["team"] = body["team"].strip()
     if "is_active" in body: updates["is_active"] = body["is_active"]
     if "password" in body and body["password"]:
-        salt = bcrypt.gensalt()
-        updates["password_hash"] = bcrypt.hashpw(body["password"].encode('utf-8'), salt).decode('utf-8')
+        updates["password_hash"] = await asyncio.to_thread(hash_password, body["password"])
         
     if not updates:
         return {"message": "No updates provided"}
         
     try:
         res = supabase.table("users").update(updates).eq("id", user_id).execute()
+        invalidate_user(res.data[0].get("username") if res.data else None)
         
         # Log action
         admin_username = getattr(request.state, "username", "unknown")
@@ -398,6 +442,7 @@ async def deactivate_user(user_id: str, request: Request):
         
     try:
         res = supabase.table("users").update({"is_active": False}).eq("id", user_id).execute()
+        invalidate_user(res.data[0].get("username") if res.data else None)
         
         # Log action
         admin_username = getattr(request.state, "username", "unknown")
@@ -470,8 +515,67 @@ async def _on_startup():
     asyncio.create_task(_periodic_cleanup())
 
 
+@app.on_event("shutdown")
+async def _on_shutdown():
+    await aclose_voice_http_client()
+
+
 # ── File Upload / Text Extraction ──
 
+# Parsing office documents is CPU-bound and can take seconds for a large
+# PDF, so it runs in worker threads; this bounds how many run (and how many
+# parsed documents are held in memory) at once.
+_extract_slots = asyncio.Semaphore(4)
+
+
+def _extract_pdf(source: BinaryIO) -> str:
+    text_parts = []
+    with pdfplumber.open(source) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text_parts.append(page_text)
+    return "\n\n".join(text_parts)
+
+
+def _extract_docx(source: BinaryIO) -> str:
+    doc = docx.Document(source)
+    return "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+
+
+def _extract_pptx(source: BinaryIO) -> str:
+    prs = Presentation(source)
+    text_parts = []
+    for slide in prs.slides:
+        for shape in slide.shapes:
+            if hasattr(shape, "text") and shape.text.strip():
+                text_parts.append(shape.text)
+    return "\n\n".join(text_parts)
+
+
+def _extract_spreadsheet(source: BinaryIO) -> str:
+    if openpyxl is None:
+        return source.read().decode("utf-8", errors="replace")
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    text_parts = []
+    for ws in wb.worksheets:
+        for row in ws.iter_rows(values_only=True):
+            row_text = ", ".join(str(cell) for cell in row if cell is not None)
+            if row_text.strip():
+                text_parts.append(row_text)
+    wb.close()
+    return "\n".join(text_parts)
+
+
+_DOCUMENT_EXTRACTORS = {
+    ".pdf": _extract_pdf,
+    ".doc": _extract_docx,
+    ".docx": _extract_docx,
+    ".pptx": _extract_pptx,
+    ".xlsx": _extract_spreadsheet,
+    ".xls": _extract_spreadsheet,
+}
+
 
 @app.post("/api/upload/extract-text")
 async def extract_text_from_file(file: UploadFile = File(...)):
@@ -480,58 +584,17 @@ async def extract_text_from_file(file: UploadFile = File(...)):
         return JSONResponse(status_code=400, content={"error": "No file provided"})
 
     ext = Path(file.filename).suffix.lower()
-    content = await file.read()
 
     try:
-        if ext == ".pdf":
-            import pdfplumber
-            import io
-            text_parts = []
-            with pdfplumber.open(io.BytesIO(content)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-            text = "\n\n".join(text_parts)
-
-        elif ext in (".doc", ".docx"):
-            import docx
-            import io
-            doc = docx.Document(io.BytesIO(content))
-            text = "\n".join(p.text for p in doc.paragraphs if p.text.strip())
-
-        elif ext == ".pptx":
-            from pptx import Presentation
-            import io
-            prs = Presentation(io.BytesIO(content))
-            text_parts = []
-            for slide in prs.slides:
-                for shape in slide.shapes:
-                    if hasattr(shape, "text") and shape.text.strip():
-                        text_parts.append(shape.text)
-            text = "\n\n".join(text_parts)
-
-        elif ext == ".csv":
-            text = content.decode("utf-8", errors="replace")
-
-        elif ext in (".xlsx", ".xls"):
-            import io
-            try:
-                import openpyxl
-                wb = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
-                text_parts = []
-                for ws in wb.worksheets:
-                    for row in ws.iter_rows(values_only=True):
-                        row_text = ", ".join(str(cell) for cell in row if cell is not None)
-                        if row_text.strip():
-                            text_parts.append(row_text)
-                text = "\n".join(text_parts)
-                wb.close()
-            except ImportError:
-                text = content.decode("utf-8", errors="replace")
-
-        elif ext in (".txt", ".md", ".json", ".rtf"):
-            text = content.decode("utf-8", errors="replace")
+        if ext in _DOCUMENT_EXTRACTORS:
+            # Parse straight from the spooled upload (on disk past 1 MB)
+            # rather than copying it into memory first
+            await file.seek(0)
+            async with _extract_slots:
+                text = await asyncio.to_thread(_DOCUMENT_EXTRACTORS[ext], file.file)
+
+        elif ext in (".csv", ".txt", ".md", ".json", ".rtf"):
+            text = (await file.read()).decode("utf-8", errors="replace")
 
         else:
             return JSONResponse(
@@ -607,13 +670,14 @@ async def pipeline_status(session_id: str):
     resp: dict[str, Any] = {
         "session_id": session_id,
         "status": state.status,
-        "progress": state.progress_log,
+        "progress": list(state.progress_log),
     }
     if state.result:
         resp["result"] = state.result
     if state.error_message:
         resp["error"] = state.error_message
-    return resp
+    # Already JSON-safe, so skip FastAPI's jsonable_encoder pass on every poll
+    return FastJSONResponse(resp)
 
 
 @app.post("/api/generate")
@@ -687,22 +751,34 @@ async def list_audio_files(session_id: str):
                 return {"session_id": session_id, "files": files}
                 
     # Fallback to local files if not in memory or no audio data
-    session_dir = OUTPUTS_DIR / session_id
-    if not session_dir.exists():
+    # One directory scan instead of a glob per extension
+    try:
+        with os.scandir(OUTPUTS_DIR / session_id) as entries:
+            audio_entries = sorted(
+                (
+                    entry for entry in entries
+                    if entry.name.endswith((".mp3", ".wav"))
+                    and not entry.name.startswith(".")
+                    and entry.is_file()
+                ),
+                key=lambda entry: entry.name,
+            )
+    except (FileNotFoundError, NotADirectoryError):
         return JSONResponse(status_code=404, content={"error": "Session not found"})
 
-    files = []
-    for f in sorted(list(session_dir.glob("*.mp3")) + list(session_dir.glob("*.wav"))):
-        files.append({
-            "name": f.name,
-            "size_bytes": f.stat().st_size,
-            "url": f"/outputs/{session_id}/{f.name}",
-        })
+    files = [
+        {
+            "name": entry.name,
+            "size_bytes": entry.stat().st_size,
+            "url": f"/outputs/{session_id}/{entry.name}",
+        }
+        for entry in audio_entries
+    ]
     return {"session_id": session_id, "files": files}
 
 
 @app.get("/api/audio/{session_id}/{filename}")
-async def download_audio(session_id: str, filename: str, fmt: str = "mp3"):
+async def download_audio(request: Request, session_id: str, filename: str, fmt: str = "mp3"):
     """Download a specific audio file.
 
     If the file was uploaded to Supabase Storage, redirect to the CDN URL.
@@ -751,12 +827,31 @@ async def download_audio(session_id: str, filename: str, fmt: str = "mp3"):
             return JSONResponse(status_code=500, content={"error": "WAV conversion failed"})
 
     media_type = "audio/wav" if actual_ext == ".wav" else "audio/mpeg"
-    return FileResponse(
+    # Passing the stat saves FileResponse a thread hop to stat the file
+    # again, and gives us its ETag up front for conditional requests
+    response = FileResponse(
         path=str(file_path),
         media_type=media_type,
         filename=file_path.name,
         headers={"Cache-Control": "public, max-age=86400, immutable"},
+        stat_result=file_path.stat(),
     )
+    etag = response.headers["etag"]
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": response.headers["cache-control"]})
+    return response
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check: weak comparison against each listed tag, or "*"."""
+    if not if_none_match:
+        return False
+    etag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
 
 
 def _find_public_url(session_id: str, filename: str) -> str | None:
@@ -779,6 +874,36 @@ def _find_public_url(session_id: str, filename: str) -> str | None:
     return None
 
 
+_SCRIPT_TEXT_RULE = "=" * 60
+_SCRIPT_TEXT_TEMPLATE = (
+    f"{_SCRIPT_TEXT_RULE}\n"
+    "VARIANT {variant_id}: {theme}\n"
+    "Language: {language}  |  Words: {word_count}  |  ~{estimated_duration_seconds}s\n"
+    f"{_SCRIPT_TEXT_RULE}\n"
+    "\n--- HOOK (0-5s) ---\n{hook}\n"
+    "\n--- BODY (5-23s) ---\n{body}\n"
+    "\n--- CTA (23-30s) ---\n{cta}\n"
+    "\n--- FULL SCRIPT ---\n{full_script}\n"
+    "\n--- FALLBACK 1 (Urgency) ---\n{fallback_1}\n"
+    "\n--- FALLBACK 2 (Psychology) ---\n{fallback_2}\n"
+    "\n--- POLITE CLOSURE ---\n{polite_closure}\n"
+)
+_SCRIPT_TEXT_DEFAULTS = {
+    "variant_id": "?",
+    "theme": "",
+    "language": "N/A",
+    "word_count": "?",
+    "estimated_duration_seconds": "?",
+    "hook": "",
+    "body": "",
+    "cta": "",
+    "full_script": "",
+    "fallback_1": "",
+    "fallback_2": "",
+    "polite_closure": "",
+}
+
+
 @app.get("/api/sessions/{session_id}/scripts")
 async def download_scripts(session_id: str, fmt: str = "json", variant_id: Optional[int] = None):
     """Download scripts for a session as JSON or plain text. Optionally filter by variant_id."""
@@ -809,32 +934,17 @@ async def download_scripts(session_id: str, fmt: str = "json", variant_id: Optio
 
     if fmt == "text":
         # Plain text format for easy reading / copy-paste
-        lines = []
-        for s in scripts:
-            lines.append(f"{'='*60}")
-            lines.append(f"VARIANT {s.get('variant_id', '?')}: {s.get('theme', '')}")
-            lines.append(f"Language: {s.get('language', 'N/A')}  |  Words: {s.get('word_count', '?')}  |  ~{s.get('estimated_duration_seconds', '?')}s")
-            lines.append(f"{'='*60}")
-            lines.append(f"\n--- HOOK (0-5s) ---\n{s.get('hook', '')}")
-            lines.append(f"\n--- BODY (5-23s) ---\n{s.get('body', '')}")
-            lines.append(f"\n--- CTA (23-30s) ---\n{s.get('cta', '')}")
-            lines.append(f"\n--- FULL SCRIPT ---\n{s.get('full_script', '')}")
-            lines.append(f"\n--- FALLBACK 1 (Urgency) ---\n{s.get('fallback_1', '')}")
-            lines.append(f"\n--- FALLBACK 2 (Psychology) ---\n{s.get('fallback_2', '')}")
-            lines.append(f"\n--- POLITE CLOSURE ---\n{s.get('polite_closure', '')}")
-            lines.append("")
-        text_content = "\n".join(lines)
-    from fastapi import Response
-    if fmt == "text":
-        return Response(
+        text_content = "\n".join(
+            _SCRIPT_TEXT_TEMPLATE.format_map({**_SCRIPT_TEXT_DEFAULTS, **s}) for s in scripts
+        )
+        return PlainTextResponse(
             content=text_content,
-            media_type="text/plain",
             headers={"Content-Disposition": f"attachment; filename=scripts_{session_id}{filename_suffix}.txt"},
         )
 
     # Default: JSON
     return Response(
-        content=json.dumps(final_scripts if variant_id is None else {"scripts": scripts}, indent=2),
+        content=json_dumps_indented(final_scripts if variant_id is None else {"scripts": scripts}),
         media_type="application/json",
         headers={"Content-Disposition": f"attachment; filename=scripts_{session_id}{filename_suffix}.json"},
     )
@@ -873,7 +983,7 @@ async def update_script(session_id: str, variant_id: int, request: Request):
 
     word_count = len(target.get("full_script", "").split())
     target["word_count"] = word_count
-    target["estimated_duration_seconds"] = round(word_count / 2.5, 1)
+    target["estimated_duration_seconds"] = word_count * 4 / 10  # 2.5 words/s, in tenths
 
     logger.info(f"Updated script variant {variant_id} in session {session_id}")
     return {"status": "ok", "script": target}
@@ -1189,19 +1299,21 @@ async def add_comment(campaign_id: str, request: Request):
     if not text:
         return JSONResponse(status_code=400, content={"error": "Comment text is required"})
 
+    campaign = get_campaign(campaign_id)
+    if not campaign:
+        return JSONResponse(status_code=404, content={"error": "Campaign not found"})
+
     comment_id = str(uuid.uuid4())
     comment = save_comment(comment_id, campaign_id, username, text)
 
     # Record activity and broadcast to collaboration room
-    campaign = get_campaign(campaign_id)
-    campaign_name = campaign["name"] if campaign else "Unknown"
     event = record_activity(
-        "comment_added", username, campaign_id, campaign_name, text[:100]
+        "comment_added", username, campaign_id, campaign["name"], text[:100]
     )
 
     room = get_or_create_room(campaign_id)
-    await room.broadcast({"type": "comment_added", "comment": comment})
-    await broadcast_to_all({"type": "activity", "event": event})
+    broadcast_in_background(room.broadcast({"type": "comment_added", "comment": comment}))
+    broadcast_in_background(broadcast_to_all({"type": "activity", "event": event}))
 
     return comment
 
@@ -1214,7 +1326,7 @@ async def remove_comment(campaign_id: str, comment_id: str):
         return JSONResponse(status_code=404, content={"error": "Comment not found"})
 
     room = get_or_create_room(campaign_id)
-    await room.broadcast({"type": "comment_deleted", "comment_id": comment_id})
+    broadcast_in_background(room.broadcast({"type": "comment_deleted", "comment_id": comment_id}))
 
     return {"deleted": True}
 
@@ -1230,7 +1342,6 @@ async def websocket_collaborate(ws: WebSocket, campaign_id: str):
     await ws.accept()
     ws_id = str(uuid.uuid4())
 
-    from backend.auth import get_token_from_websocket, verify_token, auth_enabled
     username = "local"
     if auth_enabled():
         token = get_token_from_websocket(ws)
@@ -1249,11 +1360,15 @@ async def websocket_collaborate(ws: WebSocket, campaign_id: str):
     )
 
     # Send current state to the connecting user
-    await ws.send_json({
+    await ws.send_text(encode_event({
         "type": "init",
         "users": get_users_viewing_campaign(campaign_id),
         "comments": list_comments(campaign_id),
-    })
+    }))
+
+    # Typing indicators are the chattiest event and never change for this
+    # connection, so encode the message once.
+    typing_message = encode_event({"type": "typing", "username": username})
 
     try:
         while True:
@@ -1264,10 +1379,7 @@ async def websocket_collaborate(ws: WebSocket, campaign_id: str):
                 update_user_activity(ws_id, campaign_id)
 
             elif msg_type == "typing":
-                await room.broadcast(
-                    {"type": "typing", "username": username},
-                    exclude_ws_id=ws_id,
-                )
+                await room.broadcast(typing_message, exclude_ws_id=ws_id)
     except Exception:
         pass
     finally:
@@ -1286,7 +1398,7 @@ async def websocket_progress(ws: WebSocket, session_id: str):
     """Read-only WebSocket that streams progress for a background pipeline.
 
     On connect: sends all buffered progress messages (catch-up).
-    Then streams new messages as they arrive.
+    Then streams new messages as they arrive until the pipeline finishes.
     Disconnect does NOT stop the pipeline.
     """
     if auth_enabled():
@@ -1304,9 +1416,9 @@ async def websocket_progress(ws: WebSocket, session_id: str):
     logger.info(f"Progress WS connected for session {session_id}")
 
     # Send all buffered progress (catch-up)
-    for msg in list(state.progress_log):
+    for frame in list(state.progress_frames):
         try:
-            await ws.send_json(msg)
+            await ws.send_text(frame)
         except Exception:
             return
 
@@ -1319,7 +1431,7 @@ async def websocket_progress(ws: WebSocket, session_id: str):
         return
 
     # Subscribe for live updates
-    state.subscribers.append(ws)
+    state.subscribers.add(ws)
     try:
         # Keep connection alive until client disconnects or pipeline finishes
         while True:
@@ -1330,8 +1442,7 @@ async def websocket_progress(ws: WebSocket, session_id: str):
             except WebSocketDisconnect:
                 break
     finally:
-        if ws in state.subscribers:
-            state.subscribers.remove(ws)
+        state.subscribers.discard(ws)
         logger.info(f"Progress WS disconnected for session {session_id}")
 
 
@@ -1381,18 +1492,18 @@ async def websocket_generate(ws: WebSocket):
         tts_engine = config.get("tts_engine")
 
         if not product_text or not country or not telco:
-            await ws.send_json({
+            await ws.send_text(encode_event({
                 "agent": "Pipeline",
                 "status": "error",
                 "message": "product_text, country, and telco are required",
-            })
+            }))
             await ws.close()
             return
 
         # Progress callback that sends updates via WebSocket
         async def on_progress(agent: str, status: str, data: dict[str, Any]) -> None:
             try:
-                await ws.send_json({
+                await ws.send_text(encode_event({
                     "agent": agent,
                     "status": status,
                     "message": data.get("message", ""),
@@ -1400,7 +1511,7 @@ async def websocket_generate(ws: WebSocket):
                         k: v for k, v in data.items()
                         if k != "message" and _is_json_serializable(v)
                     },
-                })
+                }))
             except Exception as e:
                 logger.warning(f"Failed to send progress update: {e}")
 
@@ -1426,30 +1537,30 @@ async def websocket_generate(ws: WebSocket):
 
         # Send the final result -- distinguish success vs failure
         has_error = "error" in result
-        await ws.send_json({
+        await ws.send_text(encode_event({
             "agent": "Pipeline",
             "status": "error" if has_error else "done",
             "message": result.get("error", "Pipeline complete"),
             "session_id": session_id,
             "result": _make_serializable(result),
-        })
+        }))
 
     except WebSocketDisconnect:
         logger.info("WebSocket client disconnected")
     except json.JSONDecodeError:
-        await ws.send_json({
+        await ws.send_text(encode_event({
             "agent": "Pipeline",
             "status": "error",
             "message": "Invalid JSON received",
-        })
+        }))
     except Exception as e:
         logger.exception(f"WebSocket error: {e}")
         try:
-            await ws.send_json({
+            await ws.send_text(encode_event({
                 "agent": "Pipeline",
                 "status": "error",
                 "message": str(e),
-            })
+            }))
         except Exception:
             pass
     finally:
@@ -1459,14 +1570,21 @@ async def websocket_generate(ws: WebSocket):
             pass
 
 
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
 def _is_json_serializable(value: Any) -> bool:
-    """Check if a value is JSON serializable."""
-    try:
-        json.dumps(value)
+    """Check if a value is JSON serializable, by type rather than by encoding it."""
+    if isinstance(value, _JSON_SCALARS):
         return True
-    except (TypeError, ValueError):
-        return False
-
+    if isinstance(value, (list, tuple)):
+        return all(map(_is_json_serializable, value))
+    if isinstance(value, dict):
+        return all(
+            isinstance(k, _JSON_SCALARS) and _is_json_serializable(v)
+            for k, v in value.items()
+        )
+    return False
 
 
 def _make_serializable(obj: Any) -> Any:
@@ -1475,6 +1593,8 @@ def _make_serializable(obj: Any) -> Any:
         return {k: _make_serializable(v) for k, v in obj.items()}
     elif isinstance(obj, list):
         return [_make_serializable(v) for v in obj]
+    elif isinstance(obj, _JSON_SCALARS):
+        return obj
     elif isinstance(obj, Path):
         return str(obj)
     elif _is_json_serializable(obj):
@@ -59,6 +59,22 @@ class PipelineOrchestrator:
         self.voice_selector = VoiceSelectorAgent(provider=provider)
         self.audio_producer = AudioProducerAgent(provider=provider)
 
+    def _script_ready_callback(
+        self, agent: str, verb: str
+    ) -> Callable[[dict[str, Any]], Awaitable[None]]:
+        """Build an on_script hook that reports each variant as the writer finishes it."""
+        ready = 0
+
+        async def _on_script(script: dict[str, Any]) -> None:
+            nonlocal ready
+            ready += 1
+            await self.on_progress(agent, "started", {
+                "message": f"{ready} script variant(s) {verb} so far...",
+                "data": script,
+            })
+
+        return _on_script
+
     async def run(
         self,
         product_text: str,
@@ -75,6 +91,9 @@ class PipelineOrchestrator:
             telco: Telco operator name.
             language: Optional target language override.
 
+        Voice selection runs concurrently with evaluation/revision and is
+        based on the initial (pre-revision) scripts.
+
         Returns:
             Complete pipeline results including all intermediate outputs.
         """
@@ -90,6 +109,7 @@ class PipelineOrchestrator:
                 f"{MAX_PRODUCT_TEXT_CHARS} chars"
             )
 
+        voice_task: asyncio.Task[dict[str, Any]] | None = None
         try:
             pipeline_start = time.monotonic()
 
@@ -150,6 +170,7 @@ class PipelineOrchestrator:
                 product_brief=product_brief,
                 market_analysis=market_analysis,
                 language_override=language,
+                on_script=self._script_ready_callback("ScriptWriter", "generated"),
             )
             results["initial_scripts"] = scripts
             await self.on_progress("ScriptWriter", "completed", {
@@ -159,6 +180,22 @@ class PipelineOrchestrator:
                 "user_prompt": self.script_writer.last_user_prompt,
             })
 
+            # Voice choice depends on the market, language and the scripts'
+            # emotional range, none of which revision changes, so select the
+            # voice from the initial scripts while evaluation/revision runs.
+            await self.on_progress("VoiceSelector", "started", {
+                "message": "Selecting optimal voice and parameters..."
+            })
+            voice_task = asyncio.create_task(self.voice_selector.run(
+                scripts=scripts,
+                market_analysis=market_analysis,
+                country=country,
+                language=language,
+            ))
+            # Retrieve the outcome even if the pipeline bails out before
+            # awaiting it, so a failure isn't reported as never retrieved.
+            voice_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
             # ── Step 4 & 5: Evaluation + Revision Loop ──
             final_scripts = scripts
             for round_num in range(EVAL_FEEDBACK_ROUNDS):
@@ -191,6 +228,7 @@ class PipelineOrchestrator:
                     feedback=evaluation,
                     previous_scripts=final_scripts,
                     language_override=language,
+                    on_script=self._script_ready_callback("ScriptWriter_Revision", "revised"),
                 )
                 results[f"revised_scripts_round_{round_num + 1}"] = final_scripts
                 await self.on_progress("ScriptWriter_Revision", "completed", {
@@ -203,15 +241,7 @@ class PipelineOrchestrator:
             results["final_scripts"] = final_scripts
 
             # ── Step 6: Voice Selection ──
-            await self.on_progress("VoiceSelector", "started", {
-                "message": "Selecting optimal voice and parameters..."
-            })
-            voice_selection = await self.voice_selector.run(
-                scripts=final_scripts,
-                market_analysis=market_analysis,
-                country=country,
-                language=language,
-            )
+            voice_selection = await voice_task
             results["voice_selection"] = voice_selection
             await self.on_progress("VoiceSelector", "completed", {
                 "message": "Voice profile optimised for campaign",
@@ -262,6 +292,9 @@ class PipelineOrchestrator:
                 "error": str(e),
             })
             results["error"] = str(e)
+        finally:
+            if voice_task is not None:
+                voice_task.cancel()
 
         return results
 
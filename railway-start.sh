@@ -9,7 +9,7 @@ echo "Starting OBD SuperStar Agent..."
 # Start the FastAPI backend in the background
 echo "Starting backend on port 8000..."
 cd /app
-uvicorn backend.main:app --host 0.0.0.0 --port 8000 &
+uvicorn backend.main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools &
 BACKEND_PID=$!
 
 # Wait for backend to be ready
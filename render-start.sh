@@ -17,7 +17,7 @@ echo "Backend port:  $BACKEND_PORT"
 # Start the FastAPI backend in the background
 echo "Starting backend..."
 cd /app
-uvicorn backend.main:app --host 0.0.0.0 --port $BACKEND_PORT &
+uvicorn backend.main:app --host 0.0.0.0 --port $BACKEND_PORT --loop uvloop --http httptools &
 BACKEND_PID=$!
 
 # Give backend a moment to start
@@ -14,7 +14,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from getpass import getpass
-import bcrypt
+from backend.auth import hash_password
 from backend.database import supabase
 
 def main():
@@ -50,8 +50,7 @@ def main():
         sys.exit(1)
 
     # Hash the password
-    salt = bcrypt.gensalt()
-    password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    password_hash = hash_password(password)
 
     user_data = {
         "username": username,
@@ -55,6 +55,12 @@ CREATE TABLE IF NOT EXISTS public.audit_log (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL
 );
 
+-- 5. Indexes for the app's list queries (newest campaigns, a campaign's comments)
+CREATE INDEX IF NOT EXISTS idx_campaigns_created_at
+    ON public.campaigns (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_comments_campaign_created
+    ON public.campaign_comments (campaign_id, created_at DESC);
+
 -- ============================================================================
 -- ROW LEVEL SECURITY (RLS) POLICIES
 -- NOTE: In this FastAPI app, the backend acts as a standard server client
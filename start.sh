@@ -34,7 +34,7 @@ sleep 1
 # ── Start Backend ──
 echo -e "${YELLOW}[2/4]${NC} Starting backend (FastAPI on port 8000)..."
 source venv/bin/activate
-uvicorn backend.main:app --host 0.0.0.0 --port 8000 --reload &
+uvicorn backend.main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --reload &
 BACKEND_PID=$!
 sleep 3
 